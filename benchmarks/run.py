@@ -0,0 +1,533 @@
+"""
+Load benchmark harness for the Mergington High School API
+
+Seeds a throwaway database with synthetic data, starts src.app:app under
+uvicorn against it, drives each workload and reports latency percentiles and
+throughput as JSON. Run from the repository root:
+
+    python benchmarks/run.py                      # against mongod on localhost
+    python benchmarks/run.py --spawn-mongod       # ephemeral mongod in a temp dir
+    python benchmarks/run.py --save-baseline      # record benchmarks/baseline.json
+    python benchmarks/run.py --scenarios listing,signup --duration 20
+    python benchmarks/run.py --cold-start --workers 4   # also time startup seeding
+
+When a baseline file exists, the run fails (exit code 1) if any scenario's p95
+latency or throughput is worse than the baseline by more than --tolerance.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+import httpx
+from pymongo import MongoClient
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT))
+
+from src.backend.database import activity_document, enrollment_documents  # noqa: E402
+from src.backend.password_hashing import hash_password  # noqa: E402
+
+DEFAULT_BASELINE = Path(__file__).resolve().parent / "baseline.json"
+
+REPLICA_SET = "bench-rs"
+
+BENCH_TEACHER = "bench-teacher"
+BENCH_PASSWORD = "bench-password"
+
+DAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+TIME_SLOTS = [("06:30", "07:45"), ("07:00", "08:00"), ("15:15", "16:45"),
+              ("15:30", "17:30"), ("10:00", "14:00"), ("13:00", "16:00")]
+TOPICS = ["Chess", "Soccer", "Robotics", "Drama", "Math", "Art", "Coding",
+          "Debate", "Science", "Music", "Volunteer", "Basketball"]
+
+
+# ===== Environment =====
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_mongod(data_dir: str, replica_set: bool = False) -> Tuple[subprocess.Popen, str]:
+    """Start a disposable mongod whose data lives in a temporary directory.
+
+    With replica_set, it runs as a single-node replica set so read
+    preferences and majority write concerns go through the real
+    replica-set code paths.
+    """
+    if not shutil.which("mongod"):
+        raise SystemExit("--spawn-mongod needs a mongod binary on PATH")
+
+    port = free_port()
+    command = ["mongod", "--dbpath", data_dir, "--port", str(port),
+               "--bind_ip", "127.0.0.1", "--quiet"]
+    if replica_set:
+        command += ["--replSet", REPLICA_SET]
+    process = subprocess.Popen(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    uri = f"mongodb://127.0.0.1:{port}/"
+
+    client = MongoClient(uri, directConnection=True, serverSelectionTimeoutMS=20000)
+    client.admin.command("ping")
+    if replica_set:
+        client.admin.command("replSetInitiate", {
+            "_id": REPLICA_SET,
+            "members": [{"_id": 0, "host": f"127.0.0.1:{port}"}]
+        })
+        deadline = time.perf_counter() + 30
+        while not client.admin.command("hello").get("isWritablePrimary"):
+            if time.perf_counter() > deadline:
+                raise SystemExit("The replica set did not elect a primary within 30 seconds")
+            time.sleep(0.2)
+        uri += f"?replicaSet={REPLICA_SET}"
+    client.close()
+    return process, uri
+
+
+def seed(uri: str, database: str, args: argparse.Namespace):
+    """Replace the benchmark database with synthetic data at the requested scale"""
+    client = MongoClient(uri)
+    client.drop_database(database)
+    db = client[database]
+    rng = random.Random(args.seed)
+
+    activities = []
+    enrollments = []
+    for i in range(args.activities):
+        days = sorted(rng.sample(DAYS, rng.randint(1, 3)), key=DAYS.index)
+        start_time, end_time = rng.choice(TIME_SLOTS)
+        name = f"{rng.choice(TOPICS)} Group {i}"
+        participants = [f"student{i}-{j}@bench.mergington.edu"
+                        for j in range(args.participants)]
+        details = {
+            "description": f"Synthetic {name.lower()} activity for benchmarking",
+            "schedule": f"{', '.join(days)}, {start_time} - {end_time}",
+            "schedule_details": {
+                "days": days,
+                "start_time": start_time,
+                "end_time": end_time
+            },
+            # Leave room for the contended signup workload
+            "max_participants": args.participants + 25,
+            "participants": participants
+        }
+        activities.append(activity_document(name, details))
+        enrollments += enrollment_documents(name, details)
+    if activities:
+        db.activities.insert_many(activities)
+    if enrollments:
+        db.enrollments.insert_many(enrollments)
+
+    db.teachers.insert_one({
+        "_id": BENCH_TEACHER,
+        "username": BENCH_TEACHER,
+        "display_name": "Benchmark Teacher",
+        "password": hash_password(BENCH_PASSWORD),
+        "role": "teacher"
+    })
+
+    announcements = [{
+        "message": f"Synthetic announcement {i}",
+        "start_date": "2024-01-01",
+        "expiration_date": "2099-12-31" if i % 2 == 0 else "2024-06-30"
+    } for i in range(args.announcements)]
+    if announcements:
+        db.announcements.insert_many(announcements)
+
+    client.close()
+    return [activity["_id"] for activity in activities]
+
+
+def start_app(uri: str, database: str, port: int, workers: int,
+              extra_env: Optional[Dict[str, str]] = None) -> Tuple[subprocess.Popen, float]:
+    """Start uvicorn and return the process and its time to first response"""
+    env = {
+        **os.environ,
+        "MONGODB_URI": uri,
+        "MONGODB_DATABASE": database,
+        "SESSION_SECRET": os.environ.get("SESSION_SECRET", "benchmark-secret"),
+        **(extra_env or {})
+    }
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "src.app:app", "--port", str(port),
+         "--workers", str(workers), "--log-level", "warning"],
+        cwd=REPO_ROOT, env=env)
+
+    deadline = started + 60
+    while time.perf_counter() < deadline:
+        if process.poll() is not None:
+            raise SystemExit("The application exited during startup")
+        try:
+            if httpx.get(f"http://127.0.0.1:{port}/activities/days").status_code == 200:
+                return process, time.perf_counter() - started
+        except httpx.TransportError:
+            pass
+        time.sleep(0.1)
+
+    process.terminate()
+    raise SystemExit("The application did not become ready within 60 seconds")
+
+
+# ===== Workloads =====
+
+class Context:
+    """State shared by the workers of one scenario"""
+
+    def __init__(self, client: httpx.AsyncClient, activity_names: List[str],
+                 token: str, args: argparse.Namespace):
+        self.client = client
+        self.activity_names = activity_names
+        self.hot_activities = activity_names[:max(1, args.hot_activities)]
+        self.headers = {"Authorization": f"Bearer {token}"}
+        self.rng = random.Random()
+        self.samples: Dict[str, List[float]] = {}
+        self.statuses: Dict[str, int] = {}
+        self.sequence = 0
+
+    async def request(self, label: str, method: str, url: str, **kwargs) -> Optional[httpx.Response]:
+        """Send a request, recording its latency under label and its status"""
+        started = time.perf_counter()
+        try:
+            response = await self.client.request(method, url, **kwargs)
+            status = str(response.status_code)
+        except httpx.HTTPError:
+            response, status = None, "transport_error"
+
+        self.samples.setdefault(label, []).append(time.perf_counter() - started)
+        self.statuses[status] = self.statuses.get(status, 0) + 1
+        return response
+
+
+async def list_activities(ctx: Context):
+    params = {"summary": "true"}
+    choice = ctx.rng.random()
+    if choice < 0.3:
+        params["day"] = ctx.rng.choice(DAYS)
+    elif choice < 0.5:
+        params["start_time"], params["end_time"] = "15:00", "18:00"
+    elif choice < 0.6:
+        params["category"] = ctx.rng.choice(["sports", "arts", "academic", "technology"])
+    await ctx.request("GET /activities", "GET", "/activities", params=params)
+
+
+async def get_days(ctx: Context):
+    await ctx.request("GET /activities/days", "GET", "/activities/days")
+
+
+async def signup_cycle(ctx: Context):
+    # A small pool of emails on a few hot activities keeps writes contended
+    activity = ctx.rng.choice(ctx.hot_activities)
+    email = f"contender{ctx.rng.randint(0, 50)}@bench.mergington.edu"
+    params = {"email": email}
+
+    response = await ctx.request(
+        "POST /activities/{name}/signup", "POST", f"/activities/{activity}/signup",
+        params=params, headers=ctx.headers)
+    if response is not None and response.status_code == 200:
+        await ctx.request(
+            "POST /activities/{name}/unregister", "POST",
+            f"/activities/{activity}/unregister", params=params, headers=ctx.headers)
+
+
+async def signup_burst(ctx: Context):
+    # Registration opening: every request is a new student, spread over all
+    # activities, so each one is a real write until the activity fills up
+    ctx.sequence += 1
+    activity = ctx.rng.choice(ctx.activity_names)
+    await ctx.request(
+        "POST /activities/{name}/signup", "POST", f"/activities/{activity}/signup",
+        params={"email": f"rush{ctx.sequence}@bench.mergington.edu"}, headers=ctx.headers)
+
+
+async def login(ctx: Context):
+    await ctx.request("POST /auth/login", "POST", "/auth/login",
+                      params={"username": BENCH_TEACHER, "password": BENCH_PASSWORD})
+
+
+async def get_active_announcements(ctx: Context):
+    await ctx.request("GET /announcements", "GET", "/announcements",
+                      params={"active_only": "true"})
+
+
+async def announcement_crud(ctx: Context):
+    params = {"message": "Benchmark announcement", "expiration_date": "2099-12-31"}
+    response = await ctx.request("POST /announcements", "POST", "/announcements",
+                                 params=params, headers=ctx.headers)
+    if response is None or response.status_code != 200:
+        return
+
+    announcement_id = response.json()["id"]
+    await ctx.request("PUT /announcements/{id}", "PUT", f"/announcements/{announcement_id}",
+                      params={**params, "message": "Updated benchmark announcement"},
+                      headers=ctx.headers)
+    await ctx.request("DELETE /announcements/{id}", "DELETE",
+                      f"/announcements/{announcement_id}", headers=ctx.headers)
+
+
+Operation = Callable[[Context], Awaitable[None]]
+
+# Weighted operations making up each scenario
+SCENARIOS: Dict[str, List[Tuple[int, Operation]]] = {
+    "listing": [(1, list_activities)],
+    "days": [(1, get_days)],
+    "signup": [(1, signup_cycle)],
+    "signup_burst": [(1, signup_burst)],
+    "login": [(1, login)],
+    "announcements": [(1, announcement_crud), (4, get_active_announcements)],
+    "mixed": [(50, list_activities), (20, get_days), (15, get_active_announcements),
+              (10, signup_cycle), (3, login), (2, announcement_crud)]
+}
+
+# signup_burst fills activities up, which would skew the scenarios after it,
+# so it only runs when asked for or through --compare-rush
+DEFAULT_SCENARIOS = [name for name in SCENARIOS if name != "signup_burst"]
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def latency_summary(values: List[float]) -> Dict[str, Any]:
+    values = sorted(values)
+    if not values:
+        return {"count": 0}
+    return {
+        "count": len(values),
+        "p50_ms": round(percentile(values, 0.50) * 1000, 2),
+        "p95_ms": round(percentile(values, 0.95) * 1000, 2),
+        "p99_ms": round(percentile(values, 0.99) * 1000, 2),
+        "max_ms": round(values[-1] * 1000, 2)
+    }
+
+
+async def run_scenario(name: str, base_url: str, activity_names: List[str],
+                       token: str, args: argparse.Namespace) -> Dict[str, Any]:
+    operations = SCENARIOS[name]
+    weights = [weight for weight, _ in operations]
+    limits = httpx.Limits(max_connections=args.concurrency)
+
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30) as client:
+        ctx = Context(client, activity_names, token, args)
+        deadline = time.perf_counter() + args.duration
+
+        async def worker():
+            while time.perf_counter() < deadline:
+                operation = ctx.rng.choices(operations, weights)[0][1]
+                await operation(ctx)
+
+        started = time.perf_counter()
+        await asyncio.gather(*[worker() for _ in range(args.concurrency)])
+        elapsed = time.perf_counter() - started
+
+    all_samples = [value for values in ctx.samples.values() for value in values]
+    return {
+        **latency_summary(all_samples),
+        "throughput_rps": round(len(all_samples) / elapsed, 2),
+        "statuses": ctx.statuses,
+        "endpoints": {label: latency_summary(values)
+                      for label, values in sorted(ctx.samples.items())}
+    }
+
+
+# ===== Reporting =====
+
+def find_regressions(report: Dict[str, Any], baseline: Dict[str, Any],
+                     tolerance: float) -> List[str]:
+    regressions = []
+    for name, result in report["scenarios"].items():
+        expected = baseline.get("scenarios", {}).get(name)
+        if not expected or not result.get("count") or not expected.get("count"):
+            continue
+
+        if result["p95_ms"] > expected["p95_ms"] * (1 + tolerance):
+            regressions.append(
+                f"{name}: p95 {result['p95_ms']}ms vs baseline {expected['p95_ms']}ms")
+        if result["throughput_rps"] < expected["throughput_rps"] * (1 - tolerance):
+            regressions.append(
+                f"{name}: throughput {result['throughput_rps']} rps vs baseline "
+                f"{expected['throughput_rps']} rps")
+    return regressions
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--mongo-uri", default="mongodb://localhost:27017/")
+    parser.add_argument("--database", default="mergington_bench",
+                        help="Database to (re)create; it is dropped before seeding")
+    parser.add_argument("--spawn-mongod", action="store_true",
+                        help="Run against a temporary mongod instead of --mongo-uri")
+    parser.add_argument("--replica-set", action="store_true",
+                        help="With --spawn-mongod, run it as a single-node replica set")
+    parser.add_argument("--activities", type=int, default=200)
+    parser.add_argument("--participants", type=int, default=20,
+                        help="Participants seeded into each activity")
+    parser.add_argument("--announcements", type=int, default=50)
+    parser.add_argument("--hot-activities", type=int, default=3,
+                        help="Activities targeted by the contended signup workload")
+    parser.add_argument("--scenarios", default=",".join(DEFAULT_SCENARIOS),
+                        help="Comma-separated scenarios to run")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=10.0,
+                        help="Seconds to run each scenario")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn worker processes")
+    parser.add_argument("--rush", action="store_true",
+                        help="Run the app with RUSH_MODE=1 (batched signups)")
+    parser.add_argument("--compare-rush", action="store_true",
+                        help="Also run signup_burst against the direct and rush-mode "
+                             "signup paths, each on freshly seeded data")
+    parser.add_argument("--cold-start", action="store_true",
+                        help="Also time app startup against an empty database, where the "
+                             "app seeds itself, and against the database it seeded")
+    parser.add_argument("--cold-start-runs", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=42, help="Random seed for synthetic data")
+    parser.add_argument("--output", help="Write the JSON report here instead of stdout")
+    parser.add_argument("--baseline", default=str(DEFAULT_BASELINE))
+    parser.add_argument("--save-baseline", action="store_true",
+                        help="Store this run as the baseline instead of comparing")
+    parser.add_argument("--tolerance", type=float, default=0.2,
+                        help="Allowed relative regression before failing (0.2 = 20%%)")
+    args = parser.parse_args()
+
+    unknown = set(args.scenarios.split(",")) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(sorted(unknown))}")
+    if args.replica_set and not args.spawn_mongod:
+        parser.error("--replica-set needs --spawn-mongod")
+    return args
+
+
+def app_env(args: argparse.Namespace, rush: bool) -> Dict[str, str]:
+    env = {"RUSH_MODE": "1" if rush else "0"}
+    if args.replica_set:
+        env["MONGODB_WRITE_CONCERN"] = "majority"
+    return env
+
+
+def run_against_app(uri: str, args: argparse.Namespace, scenarios: List[str],
+                    extra_env: Dict[str, str]) -> Tuple[float, Dict[str, Any]]:
+    """Seed, start the app, run scenarios in order and stop the app again"""
+    activity_names = seed(uri, args.database, args)
+    port = free_port()
+    app, startup_seconds = start_app(uri, args.database, port, args.workers, extra_env)
+    base_url = f"http://127.0.0.1:{port}"
+
+    try:
+        token = httpx.post(f"{base_url}/auth/login", params={
+            "username": BENCH_TEACHER, "password": BENCH_PASSWORD}).json()["token"]
+
+        results = {}
+        for name in scenarios:
+            results[name] = asyncio.run(
+                run_scenario(name, base_url, activity_names, token, args))
+    finally:
+        app.terminate()
+        app.wait()
+
+    return startup_seconds, results
+
+
+def compare_rush(uri: str, args: argparse.Namespace) -> Dict[str, Any]:
+    """Run signup_burst with and without rush mode"""
+    comparison = {}
+    for label, rush in (("direct", False), ("rush", True)):
+        _, results = run_against_app(uri, args, ["signup_burst"], app_env(args, rush))
+        comparison[label] = results["signup_burst"]
+
+    direct, rush = comparison["direct"]["throughput_rps"], comparison["rush"]["throughput_rps"]
+    comparison["throughput_ratio"] = round(rush / direct, 2) if direct else None
+    return comparison
+
+
+def time_startup(uri: str, args: argparse.Namespace, extra_env: Dict[str, str]) -> float:
+    port = free_port()
+    app, startup_seconds = start_app(uri, args.database, port, args.workers, extra_env)
+    app.terminate()
+    app.wait()
+    return startup_seconds
+
+
+def cold_start(uri: str, args: argparse.Namespace) -> Dict[str, Any]:
+    """Time startup on an empty database, which includes seeding it and
+    hashing the sample teacher passwords, and then on the seeded database"""
+    cold, warm = [], []
+    for _ in range(args.cold_start_runs):
+        client = MongoClient(uri)
+        client.drop_database(args.database)
+        client.close()
+        cold.append(time_startup(uri, args, app_env(args, args.rush)))
+        warm.append(time_startup(uri, args, app_env(args, args.rush)))
+
+    return {
+        "workers": args.workers,
+        "cold": latency_summary(cold),
+        "warm": latency_summary(warm)
+    }
+
+
+def main() -> int:
+    args = parse_args()
+    mongod = None
+    data_dir = tempfile.mkdtemp(prefix="mergington-bench-") if args.spawn_mongod else None
+
+    try:
+        uri = args.mongo_uri
+        if args.spawn_mongod:
+            mongod, uri = start_mongod(data_dir, args.replica_set)
+
+        startup_seconds, results = run_against_app(
+            uri, args, args.scenarios.split(","), app_env(args, args.rush))
+        report = {
+            "config": {key: getattr(args, key) for key in [
+                "activities", "participants", "announcements", "hot_activities",
+                "concurrency", "duration", "workers", "rush", "replica_set"]},
+            "startup_seconds": round(startup_seconds, 3),
+            "scenarios": results
+        }
+
+        if args.compare_rush:
+            report["rush_comparison"] = compare_rush(uri, args)
+        if args.cold_start:
+            report["cold_start"] = cold_start(uri, args)
+    finally:
+        if mongod is not None:
+            mongod.terminate()
+            mongod.wait()
+        if data_dir:
+            shutil.rmtree(data_dir, ignore_errors=True)
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(output + "\n")
+    else:
+        print(output)
+
+    baseline_path = Path(args.baseline)
+    if args.save_baseline:
+        baseline_path.write_text(output + "\n")
+        return 0
+
+    if baseline_path.exists():
+        regressions = find_regressions(
+            report, json.loads(baseline_path.read_text()), args.tolerance)
+        if regressions:
+            print("Regressions against baseline:", *regressions, sep="\n  ", file=sys.stderr)
+            return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,141 @@
+"""
+Compare response encoding paths for the activity listing
+
+Builds a synthetic catalogue in memory and serves it through three in-process
+FastAPI routes, so the numbers isolate encoding cost from MongoDB:
+
+  validated  returns the dict under response_model=Dict[str, Any], as the
+             list endpoints used to
+  orjson     returns one pre-encoded orjson Response, as they do now
+  streamed   streams one orjson chunk per activity, as ?stream=true does
+
+For each path it reports the median latency and the peak Python memory
+allocated while serving one request. Requests are driven straight through
+the ASGI interface and response chunks are discarded as they arrive, so the
+memory figure is the server's alone. Run it from the repository root:
+
+    python benchmarks/serialization.py --activities 10000
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Dict
+
+from fastapi import FastAPI
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT))
+
+from src.backend.serialization import dumps, json_response, streaming_json_object  # noqa: E402
+
+
+def catalogue(activities: int, participants: int) -> Dict[str, Dict[str, Any]]:
+    return {
+        f"Activity {i}": {
+            "description": f"Synthetic activity number {i} for the serialization benchmark",
+            "schedule": "Mondays and Fridays, 3:15 PM - 4:45 PM",
+            "schedule_details": {
+                "days": ["Monday", "Friday"],
+                "start_time": "15:15",
+                "end_time": "16:45"
+            },
+            "category": "academic",
+            "max_participants": participants + 10,
+            "participants": [f"student{i}-{j}@mergington.edu" for j in range(participants)]
+        }
+        for i in range(activities)
+    }
+
+
+def build_app(data: Dict[str, Dict[str, Any]]) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/validated", response_model=Dict[str, Any])
+    async def validated() -> Dict[str, Any]:
+        # Copy as the old handler did when it built the dict from a cursor
+        return {name: dict(details) for name, details in data.items()}
+
+    @app.get("/orjson")
+    async def encoded():
+        return json_response(dumps({name: dict(details) for name, details in data.items()}))
+
+    @app.get("/streamed")
+    async def streamed():
+        async def cursor():
+            for name, details in data.items():
+                yield {"_id": name, **details}
+        return streaming_json_object(cursor())
+
+    return app
+
+
+async def request(app: FastAPI, path: str) -> int:
+    """Serve one GET through the ASGI interface, returning the body size"""
+    scope = {
+        "type": "http", "asgi": {"version": "3.0", "spec_version": "2.4"}, "http_version": "1.1",
+        "method": "GET", "scheme": "http", "path": path, "raw_path": path.encode(),
+        "root_path": "", "query_string": b"", "headers": [],
+        "client": ("127.0.0.1", 1), "server": ("bench", 80)
+    }
+    size = 0
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        nonlocal size
+        if message["type"] == "http.response.body":
+            size += len(message.get("body", b""))
+
+    await app(scope, receive, send)
+    return size
+
+
+async def measure(app: FastAPI, path: str, repeat: int) -> Dict[str, Any]:
+    size = await request(app, path)  # Warm up
+
+    latencies = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        await request(app, path)
+        latencies.append(time.perf_counter() - started)
+
+    tracemalloc.start()
+    await request(app, path)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "median_ms": round(statistics.median(latencies) * 1000, 2),
+        "peak_memory_mb": round(peak / 1_000_000, 2),
+        "body_bytes": size
+    }
+
+
+async def run(args: argparse.Namespace) -> Dict[str, Any]:
+    app = build_app(catalogue(args.activities, args.participants))
+    return {path: await measure(app, f"/{path}", args.repeat)
+            for path in ("validated", "orjson", "streamed")}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--activities", type=int, default=10000)
+    parser.add_argument("--participants", type=int, default=20,
+                        help="Participants listed on each activity")
+    parser.add_argument("--repeat", type=int, default=10,
+                        help="Timed requests per path")
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args))
+    print(json.dumps({"config": vars(args), "paths": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,216 @@
+"""
+Compare concurrent capacity of the threadpool and async MongoDB paths
+
+Before the async data layer, every handler was a sync `def` calling blocking
+pymongo, so each request held one of Starlette's threadpool workers (40 by
+default) for as long as MongoDB took to answer. This serves the same
+summary listing query both ways, each under its own uvicorn process:
+
+  threadpool  `def` handler with a blocking MongoClient, as the routers were
+  async       `async def` handler with AsyncMongoClient, as they are now
+
+and drives each with closed-loop clients at increasing concurrency, reporting
+throughput and latency percentiles per level. Past the threadpool size the
+threadpool path queues requests while the async path keeps serving them.
+Against a remote cluster, where each query waits longer on the network, the
+gap appears at lower concurrency. Run it from the repository root:
+
+    python benchmarks/threadpool.py --spawn-mongod
+    python benchmarks/threadpool.py --mongo-uri mongodb://db.example:27017/ \\
+        --concurrency 32,128,512
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+import httpx
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT))
+
+from run import DAYS, free_port, latency_summary, seed, start_mongod  # noqa: E402
+
+PATHS = ("threadpool", "async")
+
+# Summary listing projection, without the participants lookup
+PROJECTION = {"description": 1, "schedule": 1, "schedule_details": 1,
+              "category": 1, "max_participants": 1, "participant_count": 1}
+
+
+def build_app(path: str, uri: str, database: str):
+    """The listing endpoint served the way `path` names"""
+    from fastapi import FastAPI
+    from pymongo import AsyncMongoClient, MongoClient
+
+    from src.backend.routers.activities import build_activity_query
+    from src.backend.serialization import dumps, json_response
+
+    app = FastAPI()
+
+    if path == "threadpool":
+        collection = MongoClient(uri)[database]["activities"]
+
+        @app.get("/activities")
+        def list_activities(day: str = None):
+            activities = {doc.pop("_id"): doc
+                          for doc in collection.find(build_activity_query(day), PROJECTION)}
+            return json_response(dumps(activities))
+    else:
+        async_collection = AsyncMongoClient(uri)[database]["activities"]
+
+        @app.get("/activities")
+        async def list_activities(day: str = None):
+            activities = {doc.pop("_id"): doc async for doc in
+                          async_collection.find(build_activity_query(day), PROJECTION)}
+            return json_response(dumps(activities))
+
+    return app
+
+
+def serve(args: argparse.Namespace):
+    import uvicorn
+
+    uvicorn.run(build_app(args.serve, args.mongo_uri, args.database),
+                host="127.0.0.1", port=args.port, log_level="warning")
+
+
+def start_server(path: str, uri: str, args: argparse.Namespace):
+    port = free_port()
+    process = subprocess.Popen(
+        [sys.executable, __file__, "--serve", path, "--port", str(port),
+         "--mongo-uri", uri, "--database", args.database],
+        cwd=REPO_ROOT, env=os.environ.copy())
+
+    deadline = time.perf_counter() + 30
+    while time.perf_counter() < deadline:
+        if process.poll() is not None:
+            raise SystemExit(f"The {path} server exited during startup")
+        try:
+            httpx.get(f"http://127.0.0.1:{port}/openapi.json")
+            return process, f"http://127.0.0.1:{port}"
+        except httpx.TransportError:
+            time.sleep(0.1)
+
+    process.terminate()
+    raise SystemExit(f"The {path} server did not become ready within 30 seconds")
+
+
+async def drive(base_url: str, concurrency: int, duration: float) -> Dict[str, Any]:
+    """Closed-loop clients each sending one request after another"""
+    samples: List[float] = []
+    errors = 0
+    limits = httpx.Limits(max_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+        deadline = time.perf_counter() + duration
+
+        async def worker(number: int):
+            nonlocal errors
+            sent = 0
+            while time.perf_counter() < deadline:
+                started = time.perf_counter()
+                try:
+                    response = await client.get(
+                        "/activities", params={"day": DAYS[(number + sent) % len(DAYS)]})
+                    if response.status_code != 200:
+                        errors += 1
+                except httpx.HTTPError:
+                    errors += 1
+                samples.append(time.perf_counter() - started)
+                sent += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*[worker(number) for number in range(concurrency)])
+        elapsed = time.perf_counter() - started
+
+    return {
+        **latency_summary(samples),
+        "throughput_rps": round(len(samples) / elapsed, 2),
+        "errors": errors
+    }
+
+
+def compare(uri: str, args: argparse.Namespace) -> Dict[str, Any]:
+    levels = [int(level) for level in args.concurrency.split(",")]
+    results: Dict[str, Any] = {}
+    for path in PATHS:
+        server, base_url = start_server(path, uri, args)
+        try:
+            results[path] = {str(level): asyncio.run(drive(base_url, level, args.duration))
+                             for level in levels}
+        finally:
+            server.terminate()
+            server.wait()
+
+    results["throughput_ratio"] = {
+        str(level): round(results["async"][str(level)]["throughput_rps"]
+                          / results["threadpool"][str(level)]["throughput_rps"], 2)
+        if results["threadpool"][str(level)]["throughput_rps"] else None
+        for level in levels
+    }
+    return results
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--mongo-uri", default="mongodb://localhost:27017/")
+    parser.add_argument("--database", default="mergington_threadpool_bench",
+                        help="Database to (re)create; it is dropped before seeding")
+    parser.add_argument("--spawn-mongod", action="store_true",
+                        help="Run against a temporary mongod instead of --mongo-uri")
+    parser.add_argument("--activities", type=int, default=200)
+    parser.add_argument("--participants", type=int, default=20,
+                        help="Participants seeded into each activity")
+    parser.add_argument("--concurrency", default="16,64,256,1024",
+                        help="Comma-separated numbers of concurrent clients")
+    parser.add_argument("--duration", type=float, default=10.0,
+                        help="Seconds to drive each concurrency level")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed for synthetic data")
+    # Internal: run one of the servers
+    parser.add_argument("--serve", choices=PATHS, help=argparse.SUPPRESS)
+    parser.add_argument("--port", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    # Only activities matter here; seed() also expects an announcement count
+    args.announcements = 0
+    return args
+
+
+def main():
+    args = parse_args()
+    if args.serve:
+        serve(args)
+        return
+
+    mongod = None
+    data_dir = tempfile.mkdtemp(prefix="mergington-threadpool-") if args.spawn_mongod else None
+    try:
+        uri = args.mongo_uri
+        if args.spawn_mongod:
+            mongod, uri = start_mongod(data_dir)
+        seed(uri, args.database, args)
+        results = compare(uri, args)
+    finally:
+        if mongod is not None:
+            mongod.terminate()
+            mongod.wait()
+        if data_dir:
+            shutil.rmtree(data_dir, ignore_errors=True)
+
+    print(json.dumps({
+        "config": {key: getattr(args, key) for key in [
+            "activities", "participants", "concurrency", "duration"]},
+        "paths": results
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
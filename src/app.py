@@ -5,25 +5,56 @@ A super simple FastAPI application that allows students to view and sign up
 for extracurricular activities at Mergington High School.
 """
 
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
-from fastapi.staticfiles import StaticFiles
 from fastapi.responses import RedirectResponse
-import os
-from pathlib import Path
-from .backend import routers, database
+from .backend import (routers, changes, database, day_summary, events, migrate_enrollments,
+                      passwords, rush, schedule, sessions)
+from .backend.admission import AdmissionMiddleware
+from .backend.metrics import MetricsMiddleware
+from .backend.static_assets import static_assets
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Fingerprint and compress the frontend before the first request
+    static_assets.build()
+    # Spawn the Argon2 workers before seeding hashes the teacher passwords
+    await passwords.password_pool.start()
+
+    # Initialize database with sample data if empty. This runs inside the
+    # event loop so it can share the async Mongo client with the routers.
+    await database.init_database()
+    # Move participants arrays left by older versions into enrollments, so
+    # signups, unregistering and rosters only ever need the collection
+    await migrate_enrollments.migrate_all()
+    await changes.backfill_change_sequence()
+    await day_summary.rebuild_day_summary()
+    await sessions.load_session_secret()
+    await schedule.schedule_index.rebuild()
+    events.broker.start()
+    yield
+    await rush.signup_batcher.drain()
+    await events.broker.stop()
+    passwords.password_pool.shutdown()
+
 
 # Initialize web host
 app = FastAPI(
     title="Mergington High School API",
-    description="API for viewing and signing up for extracurricular activities"
+    description="API for viewing and signing up for extracurricular activities",
+    lifespan=lifespan
 )
 
-# Initialize database with sample data if empty
-database.init_database()
+# Limit concurrent requests per router, shedding the excess with 503. Added
+# first so the metrics middleware wraps it and records the shed requests.
+app.add_middleware(AdmissionMiddleware)
+
+# Record per-route latency for /metrics
+app.add_middleware(MetricsMiddleware)
 
-# Mount the static files directory for serving the frontend
-current_dir = Path(__file__).parent
-app.mount("/static", StaticFiles(directory=os.path.join(current_dir, "static")), name="static")
+# Serve the frontend from memory, precompressed and with fingerprinted names
+app.mount("/static", static_assets, name="static")
 
 # Root endpoint to redirect to static index.html
 @app.get("/")
@@ -34,3 +65,7 @@ def root():
 app.include_router(routers.activities.router)
 app.include_router(routers.auth.router)
 app.include_router(routers.announcements.router)
+app.include_router(routers.events.router)
+app.include_router(routers.metrics.router)
+app.include_router(routers.students.router)
+app.include_router(routers.changes.router)
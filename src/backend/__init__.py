@@ -1,2 +0,0 @@
-from . import routers
-from . import database
\ No newline at end of file
@@ -0,0 +1,156 @@
+"""
+Admission control for the High School Management System API
+
+Requests are grouped by router, with activity reads and activity writes kept
+apart, and each group runs at most a fixed number of requests at once.
+Streamed listings and roster exports hold their slot until the last chunk is
+sent, so they get a small group of their own rather than sharing one with
+ordinary activity reads. Extra
+requests wait in a bounded queue for up to ADMISSION_QUEUE_TIMEOUT_MS; when
+the queue is full or the wait runs out they are shed with 503 and a
+Retry-After header. A burst of logins or signups therefore fills only its
+own group, and students browsing activities keep their latency.
+
+Each group is configured with ADMISSION_<GROUP>_CONCURRENCY and
+ADMISSION_<GROUP>_QUEUE, e.g. ADMISSION_AUTH_CONCURRENCY. A concurrency of 0
+turns the limit off for that group. Paths outside every group, such as the
+/events stream, are never limited.
+"""
+
+import asyncio
+import os
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl
+
+from fastapi.responses import JSONResponse
+
+from .metrics import admission_rejections
+
+ADMISSION_QUEUE_TIMEOUT_MS = float(os.environ.get("ADMISSION_QUEUE_TIMEOUT_MS", "2000"))
+ADMISSION_RETRY_AFTER_SECONDS = int(os.environ.get("ADMISSION_RETRY_AFTER_SECONDS", "1"))
+
+READ_METHODS = ("GET", "HEAD")
+
+# Query values FastAPI reads as a true boolean
+TRUE_VALUES = {"1", "true", "on", "yes", "t", "y"}
+
+
+class AdmissionLimiter:
+    """Concurrency limit with a bounded wait queue for one group of routes"""
+
+    def __init__(self, name: str, concurrency: int, queue_depth: int, timeout_seconds: float):
+        self.name = name
+        self.concurrency = concurrency
+        self.queue_depth = queue_depth
+        self.timeout_seconds = timeout_seconds
+        self.in_flight = 0
+        self.queued = 0
+        self._semaphore = asyncio.Semaphore(concurrency)
+
+    async def acquire(self) -> Optional[str]:
+        """Take a slot, or return why the request was shed ("queue_full" or "timeout")"""
+        if self._semaphore.locked():
+            if self.queued >= self.queue_depth:
+                return "queue_full"
+
+            self.queued += 1
+            try:
+                await asyncio.wait_for(self._semaphore.acquire(), self.timeout_seconds)
+            except asyncio.TimeoutError:
+                return "timeout"
+            finally:
+                self.queued -= 1
+        else:
+            await self._semaphore.acquire()
+
+        self.in_flight += 1
+        return None
+
+    def release(self):
+        self.in_flight -= 1
+        self._semaphore.release()
+
+
+def limiter_from_env(name: str, concurrency: int, queue_depth: int) -> Optional[AdmissionLimiter]:
+    prefix = f"ADMISSION_{name.upper()}"
+    concurrency = int(os.environ.get(f"{prefix}_CONCURRENCY", str(concurrency)))
+    if concurrency <= 0:
+        return None
+    return AdmissionLimiter(
+        name, concurrency,
+        int(os.environ.get(f"{prefix}_QUEUE", str(queue_depth))),
+        ADMISSION_QUEUE_TIMEOUT_MS / 1000
+    )
+
+
+# Group of the long-lived activity reads; see is_streamed()
+STREAM_GROUP = "activities_stream"
+
+# (group, path prefix, methods or None for all, default concurrency, default queue)
+GROUPS: List[Tuple[str, str, Optional[Tuple[str, ...]], int, int]] = [
+    (STREAM_GROUP, "/activities/export", READ_METHODS, 8, 16),
+    ("activities_read", "/activities", READ_METHODS, 64, 256),
+    ("activities_write", "/activities", None, 16, 64),
+    ("auth", "/auth", None, 8, 32),
+    ("announcements", "/announcements", None, 16, 64)
+]
+
+limiters: Dict[str, AdmissionLimiter] = {}
+_routes: List[Tuple[str, Optional[Tuple[str, ...]], AdmissionLimiter]] = []
+for _name, _prefix, _methods, _concurrency, _queue_depth in GROUPS:
+    _limiter = limiter_from_env(_name, _concurrency, _queue_depth)
+    if _limiter is not None:
+        limiters[_name] = _limiter
+        _routes.append((_prefix, _methods, _limiter))
+
+
+def is_streamed(method: str, path: str, query_string: bytes) -> bool:
+    """Whether a request is a GET /activities?stream=true listing"""
+    if method not in READ_METHODS or path.rstrip("/") != "/activities":
+        return False
+    return any(name == "stream" and value.lower() in TRUE_VALUES
+               for name, value in parse_qsl(query_string.decode("latin-1")))
+
+
+def limiter_for(method: str, path: str, query_string: bytes = b"") -> Optional[AdmissionLimiter]:
+    """The limiter of the first group matching a request, if any"""
+    if is_streamed(method, path, query_string):
+        return limiters.get(STREAM_GROUP)
+    for prefix, methods, limiter in _routes:
+        if (path == prefix or path.startswith(prefix + "/")) and (
+                methods is None or method in methods):
+            return limiter
+    return None
+
+
+class AdmissionMiddleware:
+    """ASGI middleware applying the per-group limits"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        limiter = limiter_for(scope["method"], scope["path"], scope.get("query_string", b""))
+        if limiter is None:
+            await self.app(scope, receive, send)
+            return
+
+        reason = await limiter.acquire()
+        if reason is not None:
+            admission_rejections.inc((limiter.name, reason))
+            response = JSONResponse(
+                {"detail": "Server is busy, please try again shortly"},
+                status_code=503,
+                headers={"Retry-After": str(ADMISSION_RETRY_AFTER_SECONDS)})
+            await response(scope, receive, send)
+            return
+
+        # Streamed responses hold their slot until the last chunk is sent
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            limiter.release()
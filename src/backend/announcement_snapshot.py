@@ -0,0 +1,103 @@
+"""
+Materialized snapshot of the active announcements for the High School Management System API
+
+The banner asks for the active announcements on every page load. Instead of
+querying each time, the active set is kept in memory and rebuilt only when an
+announcement is written or when the next start/expiration date is reached.
+That date is worked out when the snapshot is built.
+"""
+
+import os
+import time
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+from .cache import body_etag
+from .changes import HIDE_CHANGE_FIELDS
+from .database import announcements_collection
+from .serialization import dumps
+
+# Writes handled by other workers are picked up after at most this long
+SNAPSHOT_TTL_SECONDS = float(os.environ.get("ANNOUNCEMENT_SNAPSHOT_TTL_SECONDS", "5"))
+
+
+def unexpired_query(today: str) -> Dict[str, Any]:
+    """Announcements that have not expired by today; uses the expiration_date index"""
+    return {"$or": [{"expiration_date": None},
+                    {"expiration_date": {"$gte": today}}]}
+
+
+class ActiveAnnouncementsSnapshot:
+    """Active announcements plus the date on which that set next changes"""
+
+    def __init__(self):
+        self.announcements: Optional[List[Dict[str, Any]]] = None
+        # announcements encoded as JSON, ready to send
+        self.body = b"[]"
+        self.etag = body_etag(self.body)
+        self.last_modified = datetime.now(timezone.utc).replace(microsecond=0)
+        # ISO date on which an announcement starts or expires
+        self.next_boundary: Optional[str] = None
+        self._built_at = 0.0
+
+    def invalidate(self):
+        """Force a rebuild on the next read - call after every announcement write"""
+        self.announcements = None
+
+    def is_stale(self, today: str) -> bool:
+        return (self.announcements is None
+                or (self.next_boundary is not None and today >= self.next_boundary)
+                or time.monotonic() - self._built_at > SNAPSHOT_TTL_SECONDS)
+
+    async def get(self) -> List[Dict[str, Any]]:
+        today = date.today().isoformat()
+        if self.is_stale(today):
+            await self.rebuild(today)
+        return self.announcements
+
+    async def get_body(self) -> bytes:
+        await self.get()
+        return self.body
+
+    async def rebuild(self, today: str):
+        # Load everything that has not expired yet: the active announcements
+        # and the future ones whose start dates are upcoming boundaries
+        query = unexpired_query(today)
+
+        active = []
+        boundaries = []
+        # Read the primary: the snapshot is rebuilt right after writes, and a
+        # lagging secondary would keep the old banners until the next rebuild
+        async for announcement in announcements_collection.find(query, HIDE_CHANGE_FIELDS):
+            announcement["id"] = str(announcement.pop("_id"))
+            start_date = announcement.get("start_date")
+            expiration_date = announcement.get("expiration_date")
+
+            if start_date and start_date > today:
+                boundaries.append(start_date)
+                continue
+
+            active.append(announcement)
+            if expiration_date:
+                # Still active on its expiration date, gone the day after
+                # Announcements written before dates were normalized may
+                # still carry a time
+                day_after = (datetime.fromisoformat(expiration_date).date()
+                             + timedelta(days=1))
+                boundaries.append(day_after.isoformat())
+
+        # Only move Last-Modified when the content actually changed, so that
+        # rebuilds that find nothing new still let clients revalidate. It only
+        # has one-second resolution and differs between workers, so clients
+        # should prefer the ETag.
+        if active != self.announcements:
+            self.last_modified = datetime.now(timezone.utc).replace(microsecond=0)
+
+        self.announcements = active
+        self.body = dumps(active)
+        self.etag = body_etag(self.body)
+        self.next_boundary = min(boundaries) if boundaries else None
+        self._built_at = time.monotonic()
+
+
+active_announcements = ActiveAnnouncementsSnapshot()
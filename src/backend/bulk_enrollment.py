@@ -0,0 +1,289 @@
+"""
+Bulk enrollment helpers for the High School Management System API
+
+Rows of (activity, email) are parsed incrementally from a streamed request
+body and applied in batches, so memory use depends on the batch size rather
+than on the size of the upload.
+"""
+
+import asyncio
+import csv
+import json
+import logging
+from collections import defaultdict
+from typing import Any, AsyncIterator, Dict, List, Optional, Set, Tuple
+
+from pymongo.errors import BulkWriteError
+
+from .database import enrollment_document, enrollments_collection
+from .enrollments import release_seats, reserve_seats
+from .schedule import enrolled_among, schedule_index
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 1000
+
+# Server error code for a unique index violation
+DUPLICATE_KEY = 11000
+
+
+class Row:
+    """One parsed row of a bulk upload"""
+
+    def __init__(self, number: int, activity: Optional[str], email: Optional[str],
+                 status: Optional[str] = None, detail: Optional[str] = None):
+        self.number = number
+        self.activity = activity
+        self.email = email
+        self.status = status
+        self.detail = detail
+
+
+async def iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    """Split a stream of byte chunks into lines"""
+    buffer = b""
+    async for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            yield line
+
+    if buffer:
+        yield buffer
+
+
+def parse_row(number: int, raw_line: bytes, data_format: str) -> Optional[Row]:
+    """Parse and validate a single line. Returns None for blank lines and the CSV header."""
+    try:
+        line = raw_line.decode("utf-8").rstrip("\r")
+        if not line.strip():
+            return None
+
+        if data_format == "ndjson":
+            record = json.loads(line)
+            if not isinstance(record, dict):
+                raise ValueError("Expected a JSON object")
+            activity, email = record.get("activity"), record.get("email")
+        else:
+            fields = next(csv.reader([line]))
+            if [field.strip().lower() for field in fields] == ["activity", "email"]:
+                return None
+            if len(fields) != 2:
+                raise ValueError("Expected two columns: activity,email")
+            activity, email = fields
+    except (ValueError, StopIteration) as error:
+        return Row(number, None, None, "invalid", str(error) or "Malformed row")
+
+    activity = activity.strip() if isinstance(activity, str) else ""
+    email = email.strip() if isinstance(email, str) else ""
+
+    if not activity:
+        return Row(number, activity, email, "invalid", "Missing activity")
+    if "@" not in email:
+        return Row(number, activity, email, "invalid", "Invalid email")
+
+    return Row(number, activity, email)
+
+
+async def load_enrolled(rows: List[Row]) -> Set[Tuple[str, str]]:
+    """Return the (activity, email) pairs of a batch that are already enrolled"""
+    names = list({row.activity for row in rows})
+    emails = list({row.email for row in rows})
+
+    cursor = enrollments_collection.find(
+        {"activity": {"$in": names}, "email": {"$in": emails}},
+        {"_id": 0, "activity": 1, "email": 1}
+    )
+    return {(doc["activity"], doc["email"]) async for doc in cursor}
+
+
+def plan_batch(rows: List[Row], enrolled: Set[Tuple[str, str]]) -> Dict[str, List[Row]]:
+    """Mark duplicate rows and group the remaining rows by activity"""
+    requested = defaultdict(list)
+
+    for row in rows:
+        if (row.activity, row.email) in enrolled:
+            row.status, row.detail = "duplicate", "Already signed up for this activity"
+        else:
+            # Later rows in the batch for the same student are duplicates too
+            enrolled.add((row.activity, row.email))
+            requested[row.activity].append(row)
+
+    return requested
+
+
+async def mark_conflicts(requested: Dict[str, List[Row]]) -> Dict[str, List[Row]]:
+    """Mark rows whose activity overlaps one the student is already enrolled
+    in, or one an earlier row of the batch signs them up for, and drop them
+    from the request.
+
+    An earlier row blocks later overlapping rows even if it then fails for
+    lack of seats.
+    """
+    await schedule_index.refresh_if_stale()
+    overlaps = {name: schedule_index.overlapping(name) for name in requested}
+    candidates = set().union(*overlaps.values())
+    if not candidates:
+        return requested
+
+    rows = sorted((row for activity_rows in requested.values() for row in activity_rows),
+                  key=lambda row: row.number)
+    taken = await enrolled_among((row.email for row in rows), candidates)
+
+    remaining = defaultdict(list)
+    for row in rows:
+        clashes = overlaps[row.activity] & taken[row.email]
+        if clashes:
+            row.status, row.detail = "conflict", f"Schedule conflict with {min(clashes)}"
+        else:
+            taken[row.email].add(row.activity)
+            remaining[row.activity].append(row)
+    return remaining
+
+
+async def withdraw_late_conflicts(rows: List[Row], counts: Dict[str, Dict[str, int]]):
+    """Take back the enrolled rows that now overlap an enrollment written by
+    another signup since mark_conflicts() ran.
+
+    Runs after the insert, so of two overlapping signups for the same student
+    racing each other the later check always sees the other one.
+    """
+    enrolled = [row for row in rows if row.status == "enrolled"]
+    overlaps = {row.activity: schedule_index.overlapping(row.activity) for row in enrolled}
+    candidates = set().union(*overlaps.values())
+    if not candidates:
+        return
+
+    # mark_conflicts() let no overlapping rows into the batch, so anything
+    # found here was written by someone else
+    taken = await enrolled_among((row.email for row in enrolled), candidates)
+    clashing = [row for row in enrolled if overlaps[row.activity] & taken[row.email]]
+    if not clashing:
+        return
+
+    released = defaultdict(int)
+    for row in clashing:
+        clashes = overlaps[row.activity] & taken[row.email]
+        row.status, row.detail = "conflict", f"Schedule conflict with {min(clashes)}"
+        released[row.activity] += 1
+        counts[row.activity]["participant_count"] -= 1
+
+    await enrollments_collection.delete_many(
+        {"$or": [{"activity": row.activity, "email": row.email} for row in clashing]})
+    await asyncio.gather(*[
+        release_seats(name, seats) for name, seats in released.items()])
+
+
+async def apply_batch(rows: List[Row]) -> Dict[str, Dict[str, int]]:
+    """Enroll a batch of valid rows, setting each row's status.
+
+    Returns the participant_count and max_participants of every activity
+    found, as of the end of the batch.
+    """
+    counts: Dict[str, Dict[str, int]] = {}
+    if not rows:
+        return counts
+
+    requested = plan_batch(rows, await load_enrolled(rows))
+    requested = await mark_conflicts(requested)
+    if not requested:
+        return counts
+
+    # Take as many seats as each activity can give, all activities at once
+    names = list(requested)
+    reservations = await asyncio.gather(*[
+        reserve_seats(name, len(requested[name])) for name in names])
+
+    accepted: List[Row] = []
+    for name, reservation in zip(names, reservations):
+        activity_rows = requested[name]
+        if reservation is None:
+            for row in activity_rows:
+                row.status, row.detail = "not_found", "Activity not found"
+            continue
+
+        counts[name] = {
+            "participant_count": reservation["participant_count"],
+            "max_participants": reservation["max_participants"]
+        }
+        granted = reservation["granted"]
+        accepted += activity_rows[:granted]
+        for row in activity_rows[granted:]:
+            row.status, row.detail = "full", "Activity is full"
+
+    if not accepted:
+        return counts
+
+    for row in accepted:
+        row.status = "enrolled"
+
+    try:
+        await enrollments_collection.insert_many(
+            [enrollment_document(row.activity, row.email) for row in accepted],
+            ordered=False)
+    except BulkWriteError as error:
+        # Students enrolled by someone else since load_enrolled(). Their
+        # seats go back to the activity.
+        released = defaultdict(int)
+        for write_error in error.details.get("writeErrors", []):
+            row = accepted[write_error["index"]]
+            if write_error.get("code") == DUPLICATE_KEY:
+                row.status, row.detail = "duplicate", "Already signed up for this activity"
+            else:
+                # Server errors stay in the log; the client only learns the row failed
+                logger.error("Bulk signup of %s to %s failed: %s",
+                             row.email, row.activity, write_error.get("errmsg"))
+                row.status, row.detail = "error", "Write failed"
+            released[row.activity] += 1
+            counts[row.activity]["participant_count"] -= 1
+
+        await asyncio.gather(*[
+            release_seats(name, seats) for name, seats in released.items()])
+
+    await withdraw_late_conflicts(accepted, counts)
+    return counts
+
+
+async def bulk_enroll(chunks: AsyncIterator[bytes], data_format: str) -> Dict[str, Any]:
+    """Stream rows from an upload, enroll them in batches and summarize the results"""
+    counts = defaultdict(int)
+    failures = []
+    enrolled_activities = set()
+    batch: List[Row] = []
+
+    async def flush():
+        await apply_batch([row for row in batch if row.status is None])
+        for row in batch:
+            counts[row.status] += 1
+            if row.status == "enrolled":
+                enrolled_activities.add(row.activity)
+            else:
+                failures.append({
+                    "row": row.number,
+                    "activity": row.activity,
+                    "email": row.email,
+                    "status": row.status,
+                    "detail": row.detail
+                })
+        batch.clear()
+
+    number = 0
+    async for line in iter_lines(chunks):
+        number += 1
+        row = parse_row(number, line, data_format)
+        if row is None:
+            continue
+
+        batch.append(row)
+        if len(batch) >= BATCH_SIZE:
+            await flush()
+
+    if batch:
+        await flush()
+
+    return {
+        "processed": sum(counts.values()),
+        "counts": dict(counts),
+        "activities": sorted(enrolled_activities),
+        "failures": failures
+    }
@@ -0,0 +1,124 @@
+"""
+In-process response cache for the read endpoints of the High School Management System API
+
+Cached entries are tagged with a global data version. Write paths call
+bump_version() so every entry cached before the write is discarded. Because
+each uvicorn worker has its own cache, entries also expire after a short TTL,
+which bounds how stale a worker can be after a write handled by another worker.
+"""
+
+import hashlib
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+
+from fastapi import Request, Response
+
+from .serialization import dumps, json_response
+
+
+def body_etag(body: bytes) -> str:
+    # Hash the body rather than a version so that ETags agree across
+    # workers that hold the same data
+    return f'"{hashlib.sha1(body).hexdigest()}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Whether the request's If-None-Match lists this ETag"""
+    if_none_match = request.headers.get("if-none-match", "")
+    return etag in [tag.strip() for tag in if_none_match.split(",")]
+
+
+class CacheEntry:
+    """An encoded JSON body together with its ETag"""
+
+    def __init__(self, version: int, payload: Any):
+        self.version = version
+        # Encode once so cache hits only copy bytes
+        self.body = dumps(payload)
+        self.created_at = time.monotonic()
+        self.etag = body_etag(self.body)
+
+
+class VersionedCache:
+    """Bounded LRU cache whose entries are invalidated by a data version"""
+
+    def __init__(self, max_entries: int = 256, ttl: float = 5.0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.version = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Hashable, CacheEntry]" = OrderedDict()
+
+    def bump_version(self):
+        """Invalidate every cached entry after a write"""
+        self.version += 1
+        self._entries.clear()
+
+    def get(self, key: Hashable) -> Optional[CacheEntry]:
+        entry = self._entries.get(key)
+        if (entry is None or entry.version != self.version
+                or time.monotonic() - entry.created_at > self.ttl):
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry
+
+    def set(self, key: Hashable, version: int, payload: Any) -> CacheEntry:
+        entry = CacheEntry(version, payload)
+
+        # Do not store results that were loaded before a concurrent write
+        if version == self.version:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+        return entry
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "version": self.version,
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses
+        }
+
+
+response_cache = VersionedCache(
+    max_entries=int(os.environ.get("RESPONSE_CACHE_MAX_ENTRIES", "256")),
+    ttl=float(os.environ.get("RESPONSE_CACHE_TTL_SECONDS", "5"))
+)
+
+
+def bump_version():
+    """Invalidate cached responses - call after every data write"""
+    response_cache.bump_version()
+
+
+async def cached_response(
+    request: Request,
+    key: Hashable,
+    loader: Callable[[], Awaitable[Any]]
+) -> Response:
+    """Serve a payload from the cache, loading it on a miss.
+
+    The response carries an ETag, and is an empty 304 when the client
+    already holds the current representation.
+    """
+    entry = response_cache.get(key)
+    if entry is None:
+        version = response_cache.version
+        entry = response_cache.set(key, version, await loader())
+
+    # Clients may reuse their copy but must revalidate it on every request
+    headers = {"ETag": entry.etag, "Cache-Control": "no-cache"}
+
+    if etag_matches(request, entry.etag):
+        return Response(status_code=304, headers=headers)
+
+    return json_response(entry.body, headers)
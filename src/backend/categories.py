@@ -0,0 +1,47 @@
+"""
+Activity category classification for the High School Management System API
+
+Categories are computed once when an activity is written and stored on the
+document, so listing and filtering by category is a plain indexed query.
+"""
+
+# Checked in order; the first category with a matching keyword wins
+CATEGORY_KEYWORDS = [
+    ("sports", {
+        "name": ["soccer", "basketball", "sport", "fitness"],
+        "description": ["team", "game", "athletic"]
+    }),
+    ("arts", {
+        "name": ["art", "music", "theater", "drama"],
+        "description": ["creative", "paint"]
+    }),
+    ("academic", {
+        "name": ["science", "math", "academic", "study", "olympiad"],
+        "description": ["learning", "education", "competition"]
+    }),
+    ("community", {
+        "name": ["volunteer", "community"],
+        "description": ["service", "volunteer"]
+    }),
+    ("technology", {
+        "name": ["computer", "coding", "tech", "robotics"],
+        "description": ["programming", "technology", "digital", "robot"]
+    })
+]
+
+CATEGORIES = [category for category, _ in CATEGORY_KEYWORDS]
+
+DEFAULT_CATEGORY = "academic"
+
+
+def classify_activity(name: str, description: str) -> str:
+    """Determine an activity's category from keywords in its name and description"""
+    name = name.lower()
+    description = description.lower()
+
+    for category, keywords in CATEGORY_KEYWORDS:
+        if (any(word in name for word in keywords["name"])
+                or any(word in description for word in keywords["description"])):
+            return category
+
+    return DEFAULT_CATEGORY
@@ -0,0 +1,83 @@
+"""
+Change sequence for delta sync in the High School Management System API
+
+Every activity and announcement write stamps the document, inside the same
+update, with changed_at, the server's $$NOW, and change_seq, the same time
+in milliseconds since the epoch. No extra round trip or shared counter is
+involved. Deletions leave a tombstone in the deletions collection.
+GET /changes?since=<seq> returns everything stamped after since.
+
+A stamp is taken before its write lands, and writes in the same millisecond
+share one, so for a moment a later stamp can be visible while an earlier or
+equal one is still in flight. /changes therefore only advances next_since
+past changes older than CHANGES_SETTLE_SECONDS; newer ones are sent again on
+the next poll. The age is measured against the server's $$NOW, the clock the
+stamps come from, never the app host's. The window also absorbs small clock
+steps, such as after a replica set failover.
+
+Tombstones expire after DELETIONS_RETENTION_SECONDS. A client whose since is
+older than that may have missed deletions, so /changes answers it with
+everything and reset set to true, and the client replaces its copy.
+"""
+
+import os
+from typing import Any, Dict
+
+from bson import ObjectId
+
+from .database import activities_collection, announcements_collection, deletions_collection
+
+CHANGES_SETTLE_SECONDS = float(os.environ.get("CHANGES_SETTLE_SECONDS", "5"))
+
+# Stamp fields, hidden from every other API response
+HIDE_CHANGE_FIELDS = {"change_seq": 0, "changed_at": 0}
+
+
+# Stamp fields for a pipeline update's $set, evaluated by the server
+CHANGE_STAMP = {"change_seq": {"$toLong": "$$NOW"}, "changed_at": "$$NOW"}
+
+# Pipeline expression: true if the document's stamp is older than the settle
+# window, by the server's clock
+SETTLED = {"$lte": [
+    "$changed_at", {"$subtract": ["$$NOW", int(CHANGES_SETTLE_SECONDS * 1000)]}]}
+
+
+def change_stamp_if(condition: Dict[str, Any]) -> Dict[str, Any]:
+    """Stamp fields that only move when a pipeline expression is true"""
+    return {field: {"$cond": [condition, value, f"${field}"]}
+            for field, value in CHANGE_STAMP.items()}
+
+
+def literal_fields(fields: Dict[str, Any]) -> Dict[str, Any]:
+    # Values in a pipeline $set are expressions; keep strings like "$5 fee" as text
+    return {field: {"$literal": value} for field, value in fields.items()}
+
+
+async def insert_stamped(collection, document: Dict[str, Any]) -> ObjectId:
+    """Insert a document with its stamp in one write, returning its _id.
+
+    Inserts cannot evaluate $$NOW, so this is an upsert of a new _id.
+    """
+    document_id = document.get("_id", ObjectId())
+    fields = {field: value for field, value in document.items() if field != "_id"}
+    await collection.update_one(
+        {"_id": document_id},
+        [{"$set": {**literal_fields(fields), **CHANGE_STAMP}}],
+        upsert=True
+    )
+    return document_id
+
+
+async def record_deletion(kind: str, record_id: str):
+    """Leave a tombstone so polling clients learn about a deleted record.
+
+    kind is "activities" or "announcements".
+    """
+    await insert_stamped(deletions_collection, {"kind": kind, "record_id": record_id})
+
+
+async def backfill_change_sequence():
+    """Stamp documents written before change sequences existed, such as seed data"""
+    for collection in (activities_collection, announcements_collection):
+        await collection.update_many(
+            {"change_seq": {"$exists": False}}, [{"$set": CHANGE_STAMP}])
@@ -2,62 +2,353 @@
 MongoDB database configuration and setup for Mergington High School API
 """
 
-from pymongo import MongoClient
-from argon2 import PasswordHasher, exceptions as argon2_exceptions
+import asyncio
+import os
+from datetime import datetime, timedelta, timezone
 
-# Connect to MongoDB
-client = MongoClient('mongodb://localhost:27017/')
-db = client['mergington_high']
+from pymongo import AsyncMongoClient, ASCENDING, TEXT, UpdateOne, WriteConcern
+from pymongo.errors import CollectionInvalid, DuplicateKeyError, OperationFailure
+from pymongo.read_preferences import (Nearest, Primary, PrimaryPreferred, Secondary,
+                                      SecondaryPreferred)
+
+from .categories import classify_activity
+from .metrics import mongo_listener
+from .password_hashing import hash_password
+from .passwords import password_pool
+
+# Client options that can be set from the environment, by variable name
+CLIENT_OPTIONS = {
+    "MONGODB_MAX_POOL_SIZE": "maxPoolSize",
+    "MONGODB_MIN_POOL_SIZE": "minPoolSize",
+    "MONGODB_MAX_IDLE_TIME_MS": "maxIdleTimeMS",
+    "MONGODB_CONNECT_TIMEOUT_MS": "connectTimeoutMS",
+    "MONGODB_SOCKET_TIMEOUT_MS": "socketTimeoutMS",
+    "MONGODB_SERVER_SELECTION_TIMEOUT_MS": "serverSelectionTimeoutMS"
+}
+
+READ_PREFERENCES = {
+    "primary": Primary,
+    "primaryPreferred": PrimaryPreferred,
+    "secondary": Secondary,
+    "secondaryPreferred": SecondaryPreferred,
+    "nearest": Nearest
+}
+
+
+def client_options() -> dict:
+    """Pool, timeout and compression settings from the environment.
+
+    Unset variables keep the driver defaults. MONGODB_COMPRESSORS is a comma
+    separated list such as "zstd,zlib"; zstd and snappy need their Python
+    packages installed.
+    """
+    options = {option: int(os.environ[variable])
+               for variable, option in CLIENT_OPTIONS.items() if os.environ.get(variable)}
+    if os.environ.get("MONGODB_COMPRESSORS"):
+        options["compressors"] = os.environ["MONGODB_COMPRESSORS"]
+    return options
+
+
+def write_concern() -> WriteConcern:
+    """Write concern for mutations, e.g. MONGODB_WRITE_CONCERN=majority.
+
+    Unset variables keep the server's default write concern.
+    """
+    w = os.environ.get("MONGODB_WRITE_CONCERN") or None
+    if w is not None and w.isdigit():
+        w = int(w)
+    journal = os.environ.get("MONGODB_WRITE_CONCERN_JOURNAL", "").lower()
+    timeout = os.environ.get("MONGODB_WRITE_CONCERN_TIMEOUT_MS")
+
+    return WriteConcern(
+        w=w,
+        j=True if journal in ("1", "true", "yes") else None,
+        wtimeout=int(timeout) if timeout else None
+    )
+
+
+def read_preference():
+    """Read preference for GET endpoints, secondaryPreferred unless
+    MONGODB_READ_PREFERENCE says otherwise"""
+    name = os.environ.get("MONGODB_READ_PREFERENCE", "secondaryPreferred")
+    if name not in READ_PREFERENCES:
+        raise ValueError(f"Unknown MONGODB_READ_PREFERENCE: {name}")
+    if name == "primary":
+        return Primary()
+
+    staleness = os.environ.get("MONGODB_MAX_STALENESS_SECONDS")
+    return READ_PREFERENCES[name](max_staleness=int(staleness) if staleness else -1)
+
+
+# Connect to MongoDB. The async client lets request handlers await Mongo
+# directly on the event loop instead of occupying a threadpool worker.
+client = AsyncMongoClient(
+    os.environ.get("MONGODB_URI", "mongodb://localhost:27017/"),
+    event_listeners=[mongo_listener],
+    **client_options()
+)
+DATABASE_NAME = os.environ.get("MONGODB_DATABASE", "mergington_high")
+
+# Writes, and reads that decide a write, go to the primary
+db = client.get_database(DATABASE_NAME, write_concern=write_concern())
 activities_collection = db['activities']
 teachers_collection = db['teachers']
 announcements_collection = db['announcements']
+settings_collection = db['settings']
+enrollments_collection = db['enrollments']
+deletions_collection = db['deletions']
+events_collection = db['events']
+
+# Server error code for creating a collection that already exists
+NAMESPACE_EXISTS = 48
+
+# Server error code for an index that exists with different options
+INDEX_OPTIONS_CONFLICT = 85
+
+# Size of the capped collection that carries change events between workers
+EVENT_LOG_BYTES = int(os.environ.get("EVENT_LOG_BYTES", str(4 * 1024 * 1024)))
+
+# Deletion tombstones for GET /changes are removed after this long
+DELETIONS_RETENTION_SECONDS = int(
+    os.environ.get("DELETIONS_RETENTION_SECONDS", str(30 * 24 * 60 * 60)))
+
+# Plain reads for GET endpoints may be served by a secondary. They share the
+# client's connection pool and can lag the primary by the replication delay.
+read_db = client.get_database(DATABASE_NAME, read_preference=read_preference())
+activities_read_collection = read_db['activities']
+announcements_read_collection = read_db['announcements']
+enrollments_read_collection = read_db['enrollments']
 
 # Methods
 
 
-def hash_password(password):
-    """Hash password using Argon2"""
-    ph = PasswordHasher()
-    return ph.hash(password)
+async def ensure_event_log():
+    """Create the capped events collection that /events streams tail"""
+    try:
+        await db.create_collection("events", capped=True, size=EVENT_LOG_BYTES)
+    except CollectionInvalid:
+        pass  # Already exists
+    except OperationFailure as error:
+        # Another worker created it between the existence check and ours
+        if error.code != NAMESPACE_EXISTS:
+            raise
+
+
+async def ensure_deletions_ttl():
+    """Expire deletion tombstones DELETIONS_RETENTION_SECONDS after they were written"""
+    try:
+        await deletions_collection.create_index(
+            [("changed_at", ASCENDING)], name="changed_at_ttl",
+            expireAfterSeconds=DELETIONS_RETENTION_SECONDS)
+    except OperationFailure as error:
+        # The retention setting changed since the index was built
+        if error.code != INDEX_OPTIONS_CONFLICT:
+            raise
+        await db.command("collMod", deletions_collection.name, index={
+            "name": "changed_at_ttl", "expireAfterSeconds": DELETIONS_RETENTION_SECONDS})
 
 
-def verify_password(hashed_password: str, plain_password: str) -> bool:
-    """Verify a plain password against an Argon2 hashed password.
+async def ensure_indexes():
+    """Create the indexes used by the activity and announcement filters.
 
-    Returns True when the password matches, False otherwise.
+    create_index is a no-op when an identical index already exists, so this is
+    safe to run on every startup.
     """
-    ph = PasswordHasher()
+    # get_activities filters on day and/or time window
+    await activities_collection.create_index([
+        ("schedule_details.days", ASCENDING),
+        ("schedule_details.start_time", ASCENDING),
+        ("schedule_details.end_time", ASCENDING)
+    ], name="schedule_day_time")
+    await activities_collection.create_index([
+        ("schedule_details.start_time", ASCENDING),
+        ("schedule_details.end_time", ASCENDING)
+    ], name="schedule_time")
+    await activities_collection.create_index(
+        [("schedule_details.end_time", ASCENDING)], name="schedule_end_time")
+
+    # get_activities search and category filters
+    await activities_collection.create_index([
+        ("name", TEXT),
+        ("description", TEXT),
+        ("schedule", TEXT)
+    ], name="activity_search", weights={"name": 10, "description": 2, "schedule": 1})
+    await activities_collection.create_index(
+        [("category", ASCENDING)], name="category")
+
+    # One document per (activity, student). The unique index rejects double
+    # signups and serves roster pages in email order.
+    await enrollments_collection.create_index([
+        ("activity", ASCENDING),
+        ("email", ASCENDING)
+    ], name="activity_email", unique=True)
+    # /students lookups by student
+    await enrollments_collection.create_index([
+        ("email", ASCENDING),
+        ("activity", ASCENDING)
+    ], name="email_activity")
+
+    # GET /changes reads everything stamped after a sequence number
+    for collection in (activities_collection, announcements_collection, deletions_collection):
+        await collection.create_index([("change_seq", ASCENDING)], name="change_seq")
+    await ensure_deletions_ttl()
+
+    # get_announcements filters on the active date window
+    await announcements_collection.create_index(
+        [("expiration_date", ASCENDING)], name="expiration_date")
+    await announcements_collection.create_index(
+        [("start_date", ASCENDING)], name="start_date")
+
+
+# A seed lock older than this is assumed to belong to a worker that died
+SEED_LOCK_TIMEOUT = timedelta(minutes=5)
+
+# Workers that lose the seed lock wait this long for the winner to finish,
+# enough for an abandoned lock to be taken over, checking this often
+SEED_WAIT_TIMEOUT = SEED_LOCK_TIMEOUT + timedelta(minutes=1)
+SEED_POLL_SECONDS = 0.25
+
+
+async def acquire_seed_lock() -> bool:
+    """Claim the right to seed the database.
+
+    Every worker runs init_database() at startup, but only the one that
+    inserts the lock document seeds. The unique _id makes this safe across
+    processes and hosts.
+    """
+    now = datetime.now(timezone.utc)
     try:
-        ph.verify(hashed_password, plain_password)
+        await settings_collection.insert_one(
+            {"_id": "seed_lock", "state": "running", "updated_at": now})
         return True
-    except argon2_exceptions.VerifyMismatchError:
-        return False
-    except Exception:
-        # For any other exception (e.g., invalid hash), treat as non-match
-        return False
+    except DuplicateKeyError:
+        pass
+
+    # Take over a lock abandoned by a worker that died while seeding
+    result = await settings_collection.update_one(
+        {
+            "_id": "seed_lock",
+            "state": "running",
+            "updated_at": {"$lt": now - SEED_LOCK_TIMEOUT}
+        },
+        {"$set": {"updated_at": now}}
+    )
+    return result.modified_count == 1
+
+
+async def seed_teachers():
+    """Insert the sample teacher accounts, hashing their passwords off the event loop"""
+    hashes = await asyncio.gather(*[
+        password_pool.run(hash_password, teacher["password"])
+        for teacher in initial_teachers
+    ])
+
+    await teachers_collection.insert_many([
+        {"_id": teacher["username"], **teacher, "password": hashed}
+        for teacher, hashed in zip(initial_teachers, hashes)
+    ])
+
+
+def activity_document(name: str, details: dict) -> dict:
+    """Build an activity document, adding the fields derived at write time.
+
+    name is copied out of _id so it can be part of the text index. A
+    participants list in details is replaced by its count; store the
+    enrollments themselves with enrollment_documents().
+    """
+    fields = {key: value for key, value in details.items() if key != "participants"}
+    return {
+        "_id": name,
+        **fields,
+        "name": name,
+        "category": classify_activity(name, details.get("description", "")),
+        "participant_count": len(details.get("participants", []))
+    }
+
+
+def enrollment_document(activity: str, email: str) -> dict:
+    return {"activity": activity, "email": email, "enrolled_at": datetime.now(timezone.utc)}
+
 
+def enrollment_documents(name: str, details: dict) -> list:
+    """Enrollment documents for the participants list of seed data"""
+    return [enrollment_document(name, email) for email in details.get("participants", [])]
 
-def init_database():
-    """Initialize database if empty"""
 
+async def backfill_activity_fields():
+    """Add derived fields to activities written before they existed"""
+    operations = []
+    async for activity in activities_collection.find(
+            {"category": {"$exists": False}}, {"description": 1}):
+        name = activity["_id"]
+        operations.append(UpdateOne({"_id": name}, {"$set": {
+            "name": name,
+            "category": classify_activity(name, activity.get("description", ""))
+        }}))
+
+    if operations:
+        await activities_collection.bulk_write(operations, ordered=False)
+
+
+async def seed_database():
+    """Insert the sample data into every collection that is empty, then
+    mark the seed lock done"""
     # Initialize activities if empty
-    if activities_collection.count_documents({}) == 0:
-        for name, details in initial_activities.items():
-            activities_collection.insert_one({"_id": name, **details})
+    if await activities_collection.count_documents({}, limit=1) == 0:
+        await activities_collection.insert_many([
+            activity_document(name, details)
+            for name, details in initial_activities.items()
+        ])
+        await enrollments_collection.insert_many([
+            enrollment
+            for name, details in initial_activities.items()
+            for enrollment in enrollment_documents(name, details)
+        ])
 
     # Initialize teacher accounts if empty
-    if teachers_collection.count_documents({}) == 0:
-        for teacher in initial_teachers:
-            teachers_collection.insert_one(
-                {"_id": teacher["username"], **teacher})
+    if await teachers_collection.count_documents({}, limit=1) == 0:
+        await seed_teachers()
 
     # Initialize announcements if empty
-    if announcements_collection.count_documents({}) == 0:
-        for announcement in initial_announcements:
-            announcements_collection.insert_one(announcement)
+    if await announcements_collection.count_documents({}, limit=1) == 0:
+        await announcements_collection.insert_many([
+            dict(announcement) for announcement in initial_announcements
+        ])
+
+    await settings_collection.update_one(
+        {"_id": "seed_lock"},
+        {"$set": {"state": "done", "updated_at": datetime.now(timezone.utc)}}
+    )
+
+
+async def init_database():
+    """Initialize database if empty.
+
+    Returns once the database is seeded, whichever worker seeded it, so the
+    startup steps that follow never see a half-seeded database.
+    """
+
+    await ensure_indexes()
+    await ensure_event_log()
+    await backfill_activity_fields()
+
+    deadline = datetime.now(timezone.utc) + SEED_WAIT_TIMEOUT
+    while True:
+        if await acquire_seed_lock():
+            await seed_database()
+            return
+
+        lock = await settings_collection.find_one({"_id": "seed_lock"}, {"state": 1})
+        if lock is not None and lock.get("state") == "done":
+            return
+
+        if datetime.now(timezone.utc) >= deadline:
+            raise RuntimeError("Timed out waiting for another worker to seed the database")
+        await asyncio.sleep(SEED_POLL_SECONDS)
 
 
-# Initial database if empty
+# Initial database if empty. Teacher passwords are in plain text here and are
+# only hashed by seed_teachers() when the accounts are actually inserted.
 initial_activities = {
     "Chess Club": {
         "description": "Learn strategies and compete in chess tournaments",
@@ -197,19 +488,19 @@ initial_teachers = [
     {
         "username": "mrodriguez",
         "display_name": "Ms. Rodriguez",
-        "password": hash_password("art123"),
+        "password": "art123",
         "role": "teacher"
     },
     {
         "username": "mchen",
         "display_name": "Mr. Chen",
-        "password": hash_password("chess456"),
+        "password": "chess456",
         "role": "teacher"
     },
     {
         "username": "principal",
         "display_name": "Principal Martinez",
-        "password": hash_password("admin789"),
+        "password": "admin789",
         "role": "admin"
     }
 ]
@@ -0,0 +1,69 @@
+"""
+Materialized per-day activity summary for the High School Management System API
+
+One settings document records, for every day that has activities, how many
+activities meet that day and the earliest start and latest end time. It is
+rebuilt at startup and, by whichever worker reads it first, once it is older
+than DAY_SUMMARY_TTL_SECONDS, so reads share one aggregation per interval
+and changes made outside the app, such as by the migration command, are
+picked up.
+"""
+
+import os
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List
+
+from .database import activities_collection, settings_collection
+from .schedule import WEEKDAYS
+
+SUMMARY_ID = "day_summary"
+
+DAY_SUMMARY_TTL_SECONDS = float(os.environ.get("DAY_SUMMARY_TTL_SECONDS", "60"))
+
+
+async def rebuild_day_summary() -> Dict[str, Any]:
+    """Recompute the whole summary from the activities and store it"""
+    pipeline = [
+        {"$unwind": "$schedule_details.days"},
+        {"$group": {
+            "_id": "$schedule_details.days",
+            "activity_count": {"$sum": 1},
+            "earliest_start": {"$min": "$schedule_details.start_time"},
+            "latest_end": {"$max": "$schedule_details.end_time"}
+        }}
+    ]
+    days = {}
+    async for day in await activities_collection.aggregate(pipeline):
+        days[day.pop("_id")] = day
+
+    summary = {
+        "total": await activities_collection.count_documents({}),
+        "days": days,
+        "built_at": datetime.now(timezone.utc)
+    }
+    await settings_collection.replace_one({"_id": SUMMARY_ID}, summary, upsert=True)
+    return summary
+
+
+def is_stale(summary: Dict[str, Any]) -> bool:
+    built_at = summary.get("built_at")
+    return built_at is None or datetime.now(timezone.utc) - built_at.replace(
+        tzinfo=timezone.utc) > timedelta(seconds=DAY_SUMMARY_TTL_SECONDS)
+
+
+def day_order(day: str):
+    # Calendar days first, anything unexpected after them alphabetically
+    return (WEEKDAYS.index(day), "") if day in WEEKDAYS else (len(WEEKDAYS), day)
+
+
+async def load_day_summary() -> Dict[str, Any]:
+    """The summary with its days as a list in calendar order"""
+    summary = await settings_collection.find_one({"_id": SUMMARY_ID})
+    if summary is None or is_stale(summary):
+        summary = await rebuild_day_summary()
+    days: List[Dict[str, Any]] = [
+        {"day": day, **entry}
+        for day, entry in sorted(summary.get("days", {}).items(), key=lambda item: day_order(item[0]))
+        if entry.get("activity_count", 0) > 0
+    ]
+    return {"total": summary["total"], "days": days}
@@ -0,0 +1,207 @@
+"""
+Enrollment storage for the High School Management System API
+
+Each enrollment is its own document in the enrollments collection, unique on
+(activity, email). The activity document only keeps a participant_count
+counter, so signing up never rewrites a growing roster.
+
+A single signup inserts the enrollment first, so the unique index rejects
+duplicates before any seat is touched. It then checks the student's other
+enrollments for a schedule conflict and reserves the seat, deleting the
+enrollment again if either fails. Because the check follows the insert, of
+two overlapping signups for the same student racing each other the later
+check always sees the other enrollment, so they cannot both succeed (both
+may be refused). An enrollment is visible to other signups' conflict checks
+from its insert until it is deleted again, so a signup can be refused for
+overlapping an enrollment that is then withdrawn because its activity was
+full; retrying the signup succeeds. Bulk signups reserve seats for a
+whole batch first and release the ones whose insert fails. If a worker dies
+between the two steps the counter is off by one; the migration command's
+--recount option repairs the counters.
+"""
+
+from typing import Any, Dict, List, Optional
+
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+from .changes import CHANGE_STAMP, HIDE_CHANGE_FIELDS, change_stamp_if
+from .database import (activities_collection, enrollment_document, enrollments_collection,
+                       enrollments_read_collection)
+from .schedule import find_schedule_conflict
+
+# Current participant count. Activities not yet migrated still carry a
+# participants array and no counter.
+PARTICIPANT_COUNT = {
+    "$ifNull": ["$participant_count", {"$size": {"$ifNull": ["$participants", []]}}]
+}
+
+
+async def reserve_seats(activity: str, seats: int) -> Optional[Dict[str, Any]]:
+    """Take up to `seats` free seats on an activity in one atomic update.
+
+    The activity's change stamp only moves if a seat was taken. Returns None if the activity does not exist, otherwise a dict
+    with `granted` (how many seats were taken), `participant_count` (after
+    the update) and `max_participants`.
+    """
+    has_room = {"$lt": [PARTICIPANT_COUNT, {"$ifNull": ["$max_participants", 0]}]}
+    state = await activities_collection.find_one_and_update(
+        {"_id": activity},
+        [{"$set": {
+            "participant_count": {
+                "$max": [
+                    PARTICIPANT_COUNT,
+                    {"$min": [
+                        {"$ifNull": ["$max_participants", 0]},
+                        {"$add": [PARTICIPANT_COUNT, seats]}
+                    ]}
+                ]
+            },
+            **change_stamp_if(has_room)
+        }}],
+        projection={"_id": 0, "participant_count": PARTICIPANT_COUNT, "max_participants": 1},
+        return_document=ReturnDocument.BEFORE
+    )
+    if state is None:
+        return None
+
+    max_participants = state.get("max_participants", 0)
+    granted = max(0, min(seats, max_participants - state["participant_count"]))
+    return {
+        "granted": granted,
+        "participant_count": state["participant_count"] + granted,
+        "max_participants": max_participants
+    }
+
+
+async def release_seats(activity: str, seats: int) -> Optional[Dict[str, Any]]:
+    """Give back seats, returning the activity's counts afterwards"""
+    return await activities_collection.find_one_and_update(
+        {"_id": activity},
+        [{"$set": {
+            "participant_count": {"$max": [0, {"$subtract": [PARTICIPANT_COUNT, seats]}]},
+            **CHANGE_STAMP
+        }}],
+        projection={"_id": 0, "participant_count": 1, "max_participants": 1},
+        return_document=ReturnDocument.AFTER
+    )
+
+
+async def enroll(activity: str, email: str) -> Dict[str, Any]:
+    """Enroll one student.
+
+    Returns a dict whose `status` is one of "enrolled", "not_found",
+    "duplicate", "conflict" (with a `detail`) or "full", plus the activity's
+    counts when it was enrolled.
+    """
+    try:
+        inserted = await enrollments_collection.insert_one(enrollment_document(activity, email))
+    except DuplicateKeyError:
+        return {"status": "duplicate"}
+
+    conflict = await find_schedule_conflict(activity, email)
+    if conflict:
+        await enrollments_collection.delete_one({"_id": inserted.inserted_id})
+        return {"status": "conflict", "detail": f"Schedule conflict with {conflict}"}
+
+    reservation = await reserve_seats(activity, 1)
+    if reservation is None or not reservation["granted"]:
+        await enrollments_collection.delete_one({"_id": inserted.inserted_id})
+        return {"status": "not_found" if reservation is None else "full"}
+
+    return {"status": "enrolled", **reservation}
+
+
+async def unenroll(activity: str, email: str) -> Dict[str, Any]:
+    """Remove one student.
+
+    Returns a dict whose `status` is one of "removed", "not_found" or
+    "not_registered", plus the activity's counts when it was removed.
+    """
+    result = await enrollments_collection.delete_one({"activity": activity, "email": email})
+    if result.deleted_count == 0:
+        exists = await activities_collection.count_documents({"_id": activity}, limit=1)
+        return {"status": "not_registered" if exists else "not_found"}
+
+    state = await release_seats(activity, 1)
+    if state is None:
+        return {"status": "not_found"}
+
+    return {"status": "removed", **state}
+
+
+def roster_lookup(as_field: str = "participants") -> Dict[str, Any]:
+    """$lookup stage that rebuilds an activity's participants array, in signup order"""
+    return {"$lookup": {
+        "from": enrollments_collection.name,
+        "localField": "_id",
+        "foreignField": "activity",
+        "pipeline": [
+            {"$sort": {"enrolled_at": 1, "_id": 1}},
+            {"$project": {"_id": 0, "email": 1}}
+        ],
+        "as": as_field
+    }}
+
+
+def roster_emails(field: str = "participants") -> Dict[str, Any]:
+    """$set stage turning the looked-up enrollment documents into plain emails"""
+    return {"$set": {field: f"${field}.email"}}
+
+
+def activity_view_stages() -> List[Dict[str, Any]]:
+    """Stages shaping activity documents as the full (non-summary) listing shows them"""
+    # name duplicates _id and is only stored for the text index
+    return [
+        roster_lookup(),
+        roster_emails(),
+        {"$project": {"name": 0, "participant_count": 0, **HIDE_CHANGE_FIELDS}}
+    ]
+
+
+async def roster_page(activity: str, after: Optional[str], limit: int) -> List[str]:
+    """Emails enrolled in an activity, ordered by email, starting after `after`"""
+    query: Dict[str, Any] = {"activity": activity}
+    if after:
+        query["email"] = {"$gt": after}
+
+    cursor = enrollments_read_collection.find(query, {"_id": 0, "email": 1}) \
+        .sort("email", 1).limit(limit)
+    return [doc["email"] async for doc in cursor]
+
+
+# Columns of the roster export, in order
+EXPORT_FIELDS = ["activity", "email", "enrolled_at", "category", "days", "start_time", "end_time"]
+
+
+def roster_export_stages() -> List[Dict[str, Any]]:
+    """Stages turning activity documents into one row per enrolled student.
+
+    Activities come out in name order and each roster in email order, so only
+    one activity's roster is held at a time. Activities without participants
+    produce no rows.
+    """
+    return [
+        {"$sort": {"_id": 1}},
+        {"$lookup": {
+            "from": enrollments_collection.name,
+            "localField": "_id",
+            "foreignField": "activity",
+            "pipeline": [
+                {"$sort": {"email": 1}},
+                {"$project": {"_id": 0, "email": 1, "enrolled_at": 1}}
+            ],
+            "as": "enrollment"
+        }},
+        {"$unwind": "$enrollment"},
+        {"$project": {
+            "_id": 0,
+            "activity": "$_id",
+            "email": "$enrollment.email",
+            "enrolled_at": "$enrollment.enrolled_at",
+            "category": 1,
+            "days": "$schedule_details.days",
+            "start_time": "$schedule_details.start_time",
+            "end_time": "$schedule_details.end_time"
+        }}
+    ]
@@ -0,0 +1,174 @@
+"""
+Change event broker for the High School Management System API
+
+Write endpoints publish small change events by appending them to a capped
+events collection. Each worker appends through a single writer task, so its
+events reach the log in the order they were published. Every worker tails
+that collection and fans each event out to its own open /events streams, so
+a browser hears about writes handled by any worker. Each stream receives events through its own bounded queue.
+Streams are plain asyncio tasks, so idle connections cost no threads. A
+subscriber that falls too far behind is disconnected; the browser's
+EventSource reconnects and reloads its data.
+"""
+
+import asyncio
+import logging
+import os
+from typing import Any, Dict, Optional, Set
+
+from bson import ObjectId
+from pymongo import CursorType
+
+from .database import events_collection
+
+logger = logging.getLogger(__name__)
+
+SUBSCRIBER_QUEUE_SIZE = int(os.environ.get("EVENTS_QUEUE_SIZE", "100"))
+
+# Pause before reopening the tailing cursor after it dies or fails
+TAIL_RETRY_SECONDS = 1.0
+
+# Most events appended to the log in one write
+APPEND_BATCH_SIZE = 100
+
+
+class Subscription:
+    """One open event stream"""
+
+    def __init__(self):
+        self.queue: "asyncio.Queue[Optional[Dict[str, Any]]]" = asyncio.Queue(
+            maxsize=SUBSCRIBER_QUEUE_SIZE)
+        self.overflowed = False
+
+
+class EventBroker:
+    """Publish events to the shared event log and fan the log out to this
+    worker's subscriptions"""
+
+    def __init__(self):
+        self._subscriptions: Set[Subscription] = set()
+        # Events waiting for the writer, in publish order
+        self._outbox: "asyncio.Queue[Dict[str, Any]]" = asyncio.Queue()
+        self._writer: Optional[asyncio.Task] = None
+        self._tail: Optional[asyncio.Task] = None
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscriptions)
+
+    def subscribe(self) -> Subscription:
+        subscription = Subscription()
+        self._subscriptions.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        self._subscriptions.discard(subscription)
+
+    def deliver(self, event: Dict[str, Any]):
+        """Hand an event to every subscription of this worker"""
+        for subscription in list(self._subscriptions):
+            try:
+                subscription.queue.put_nowait(event)
+            except asyncio.QueueFull:
+                # Drop the slow consumer rather than buffering without limit
+                subscription.overflowed = True
+                self.unsubscribe(subscription)
+
+    def publish(self, event: Dict[str, Any]):
+        """Queue an event for the log without making the caller wait for it.
+
+        Events are delivered by the tail, this worker's own included.
+        """
+        self._outbox.put_nowait(dict(event))
+
+    async def _write_events(self):
+        # The only writer of this worker's events. Concurrent inserts could
+        # land out of order and leave browsers on an older participant count.
+        while True:
+            events = [await self._outbox.get()]
+            while len(events) < APPEND_BATCH_SIZE and not self._outbox.empty():
+                events.append(self._outbox.get_nowait())
+            try:
+                await events_collection.insert_many(events, ordered=True)
+            except Exception:
+                logger.exception("Could not publish %d events", len(events))
+            finally:
+                for _ in events:
+                    self._outbox.task_done()
+
+    async def _last_event_id(self) -> Optional[ObjectId]:
+        last = await events_collection.find_one({}, {"_id": 1}, sort=[("$natural", -1)])
+        return last["_id"] if last else None
+
+    async def _tail_events(self):
+        # Start after the newest event already in the log. Events are read in
+        # insertion order and skipped until that one has gone by, because
+        # ObjectIds from different workers are not ordered.
+        resume_after = await self._last_event_id()
+        while True:
+            try:
+                cursor = events_collection.find(
+                    {}, cursor_type=CursorType.TAILABLE_AWAIT).sort("$natural", 1)
+                skipping = resume_after is not None
+                while cursor.alive:
+                    try:
+                        event = await cursor.next()
+                    except StopAsyncIteration:
+                        continue
+
+                    if skipping:
+                        skipping = event["_id"] != resume_after
+                        continue
+                    resume_after = event.pop("_id")
+                    self.deliver(event)
+
+                if skipping:
+                    # The resume point rolled out of the capped log; events
+                    # in between are lost and clients catch up on reconnect
+                    resume_after = await self._last_event_id()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Event log tail failed, reopening")
+            await asyncio.sleep(TAIL_RETRY_SECONDS)
+
+    def start(self):
+        """Start writing and tailing the event log - call at startup"""
+        if self._writer is None:
+            self._writer = asyncio.create_task(self._write_events())
+        if self._tail is None:
+            self._tail = asyncio.create_task(self._tail_events())
+
+    async def stop(self):
+        """Finish pending publishes and stop tailing - call at shutdown"""
+        if self._writer is not None:
+            await self._outbox.join()
+            self._writer.cancel()
+            await asyncio.gather(self._writer, return_exceptions=True)
+            self._writer = None
+        if self._tail is not None:
+            self._tail.cancel()
+            await asyncio.gather(self._tail, return_exceptions=True)
+            self._tail = None
+
+
+broker = EventBroker()
+
+
+def publish_activity_counts(name: str, participant_count: int, max_participants: int):
+    """Announce an activity's new participant count"""
+    broker.publish({
+        "type": "activity",
+        "name": name,
+        "participant_count": participant_count,
+        "spots_left": max_participants - participant_count
+    })
+
+
+def publish_announcement(action: str, announcement: Dict[str, Any]):
+    """Announce that an announcement was created, updated or deleted"""
+    broker.publish({
+        "type": "announcement",
+        "action": action,
+        "announcement": announcement
+    })
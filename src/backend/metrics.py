@@ -0,0 +1,238 @@
+"""
+Request and MongoDB instrumentation for the High School Management System API
+
+MetricsMiddleware records a latency histogram per route. MongoCommandListener
+is registered on the MongoClient and records per-collection, per-command
+durations and the number of documents returned. Both are rendered in the
+Prometheus text format by render_prometheus().
+
+Set SLOW_REQUEST_MS to log every request slower than that threshold together
+with the Mongo commands it issued.
+"""
+
+import logging
+import os
+import time
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from pymongo import monitoring
+
+logger = logging.getLogger(__name__)
+
+SLOW_REQUEST_MS = float(os.environ["SLOW_REQUEST_MS"]) if os.environ.get("SLOW_REQUEST_MS") else None
+
+# Upper bounds in seconds, matching the Prometheus client defaults
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.075, 0.1, 0.25, 0.5,
+                   0.75, 1.0, 2.5, 5.0, 7.5, 10.0)
+
+# Mongo commands issued by the request currently being handled, if it is
+# being traced for the slow request log
+_request_commands: ContextVar[Optional[List[Dict[str, Any]]]] = ContextVar(
+    "request_commands", default=None)
+
+
+class Histogram:
+    """Cumulative histogram keyed by a tuple of label values"""
+
+    def __init__(self, name: str, help_text: str, label_names: Tuple[str, ...],
+                 buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        self.buckets = buckets
+        self._series: Dict[Tuple[str, ...], List[float]] = {}
+
+    def observe(self, labels: Tuple[str, ...], value: float):
+        # Layout: one counter per bucket, then +Inf, sum
+        series = self._series.get(labels)
+        if series is None:
+            series = self._series[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+
+        for index, bound in enumerate(self.buckets):
+            if value <= bound:
+                series[index] += 1
+        series[len(self.buckets)] += 1
+        series[-1] += value
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        for labels, series in sorted(self._series.items()):
+            label_text = format_labels(self.label_names, labels)
+            for bound, count in zip(self.buckets, series):
+                lines.append(
+                    f'{self.name}_bucket{{{label_text},le="{bound}"}} {count}')
+            lines.append(
+                f'{self.name}_bucket{{{label_text},le="+Inf"}} {series[len(self.buckets)]}')
+            lines.append(f"{self.name}_sum{{{label_text}}} {series[-1]}")
+            lines.append(f"{self.name}_count{{{label_text}}} {series[len(self.buckets)]}")
+        return lines
+
+
+class Counter:
+    """Monotonic counter keyed by a tuple of label values"""
+
+    def __init__(self, name: str, help_text: str, label_names: Tuple[str, ...]):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, labels: Tuple[str, ...], amount: float = 1):
+        self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        for labels, value in sorted(self._values.items()):
+            lines.append(f"{self.name}{{{format_labels(self.label_names, labels)}}} {value}")
+        return lines
+
+
+def format_labels(names: Tuple[str, ...], values: Tuple[str, ...]) -> str:
+    escaped = (str(value).replace("\\", "\\\\").replace('"', '\\"') for value in values)
+    return ",".join(f'{name}="{value}"' for name, value in zip(names, escaped))
+
+
+request_duration = Histogram(
+    "http_request_duration_seconds", "HTTP request latency by route",
+    ("method", "route", "status"))
+mongo_command_duration = Histogram(
+    "mongodb_command_duration_seconds", "MongoDB command latency by collection and command",
+    ("collection", "command"))
+mongo_documents_returned = Counter(
+    "mongodb_documents_returned_total", "Documents returned by MongoDB commands",
+    ("collection", "command"))
+mongo_command_failures = Counter(
+    "mongodb_command_failures_total", "Failed MongoDB commands",
+    ("collection", "command"))
+password_job_duration = Histogram(
+    "password_hash_duration_seconds", "Argon2 hashing and verification time, including queueing",
+    ("operation",))
+admission_rejections = Counter(
+    "http_admission_rejections_total", "Requests shed with 503 by admission control",
+    ("group", "reason"))
+
+# Callables returning extra gauge lines, registered by other modules
+_gauge_collectors: List[Callable[[], List[Tuple[str, str, float]]]] = []
+
+
+def register_gauges(collector: Callable[[], List[Tuple[str, str, float]]]):
+    """Register a callable returning (name, help, value) gauges for /metrics"""
+    _gauge_collectors.append(collector)
+
+
+def render_prometheus() -> str:
+    lines = []
+    for metric in (request_duration, mongo_command_duration, mongo_documents_returned,
+                   mongo_command_failures, password_job_duration, admission_rejections):
+        lines += metric.render()
+
+    for collector in _gauge_collectors:
+        for name, help_text, value in collector():
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} gauge", f"{name} {value}"]
+
+    return "\n".join(lines) + "\n"
+
+
+def documents_in_reply(reply: Dict[str, Any]) -> int:
+    """Count the documents a command reply carries back to the client"""
+    cursor = reply.get("cursor")
+    if isinstance(cursor, dict):
+        return len(cursor.get("firstBatch", cursor.get("nextBatch", [])))
+    if "value" in reply:  # findAndModify
+        return 1 if reply["value"] is not None else 0
+    return 0
+
+
+class MongoCommandListener(monitoring.CommandListener):
+    """Record the duration and result size of every Mongo command"""
+
+    def __init__(self):
+        self._collections: Dict[Tuple[Any, int], str] = {}
+
+    def started(self, event: monitoring.CommandStartedEvent):
+        # Most commands name their collection as the value of the command key
+        collection = event.command.get(event.command_name)
+        if event.command_name == "getMore":
+            collection = event.command.get("collection")
+        if not isinstance(collection, str):
+            collection = ""
+        self._collections[(event.connection_id, event.request_id)] = collection
+
+    def _finish(self, event, documents: int, failed: bool):
+        collection = self._collections.pop((event.connection_id, event.request_id), "")
+        labels = (collection, event.command_name)
+        seconds = event.duration_micros / 1_000_000
+
+        mongo_command_duration.observe(labels, seconds)
+        if failed:
+            mongo_command_failures.inc(labels)
+        else:
+            mongo_documents_returned.inc(labels, documents)
+
+        commands = _request_commands.get()
+        if commands is not None:
+            commands.append({
+                "collection": collection,
+                "command": event.command_name,
+                "duration_ms": round(seconds * 1000, 2),
+                "documents": documents,
+                "failed": failed
+            })
+
+    def succeeded(self, event: monitoring.CommandSucceededEvent):
+        self._finish(event, documents_in_reply(event.reply), False)
+
+    def failed(self, event: monitoring.CommandFailedEvent):
+        self._finish(event, 0, True)
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording request latency by route template"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = "500"
+        is_stream = False
+
+        async def send_with_status(message):
+            nonlocal status, is_stream
+            if message["type"] == "http.response.start":
+                status = str(message["status"])
+                # Starlette appends a charset, e.g. text/event-stream; charset=utf-8
+                is_stream = any(
+                    name.lower() == b"content-type" and value.startswith(b"text/event-stream")
+                    for name, value in message.get("headers", []))
+            await send(message)
+
+        commands = [] if SLOW_REQUEST_MS is not None else None
+        token = _request_commands.set(commands)
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - started
+            _request_commands.reset(token)
+
+            # Event streams stay open by design: their duration is neither a
+            # latency sample nor "slow"
+            if not is_stream:
+                # Label by route template so path parameters do not explode cardinality
+                route = scope.get("route")
+                route_path = getattr(route, "path", None) or "unmatched"
+                request_duration.observe((scope["method"], route_path, status), elapsed)
+
+            if (SLOW_REQUEST_MS is not None and not is_stream
+                    and elapsed * 1000 >= SLOW_REQUEST_MS):
+                logger.warning(
+                    "Slow request %s %s took %.1fms (status %s), mongo commands: %s",
+                    scope["method"], scope["path"], elapsed * 1000, status, commands)
+
+
+mongo_listener = MongoCommandListener()
@@ -0,0 +1,108 @@
+"""
+Move embedded participants arrays into the enrollments collection
+
+The app runs the migration at startup, before it serves requests. It can
+also be run by hand from the repository root while the app keeps serving:
+
+    python -m src.backend.migrate_enrollments [--recount]
+
+Each activity that still has a participants array is migrated on its own:
+its emails are upserted into enrollments, then the array is removed and
+participant_count is set from the enrollments collection. Signups that land
+on an activity before it is migrated already go to enrollments and the
+counter, so no enrollment is lost. Running the command again is harmless.
+
+--recount also recomputes participant_count for every activity. It repairs
+counters left behind by a worker that died mid-signup, or by a signup racing
+the migration of its activity, and is best run while signups are quiet.
+"""
+
+import argparse
+import asyncio
+from typing import Tuple
+
+from pymongo import UpdateOne
+
+from .database import (activities_collection, client, enrollment_document,
+                       enrollments_collection, ensure_indexes)
+
+
+async def count_enrollments(activity: str) -> int:
+    return await enrollments_collection.count_documents({"activity": activity})
+
+
+async def migrate_activity(activity: dict) -> int:
+    """Copy one activity's participants into enrollments and drop the array"""
+    name = activity["_id"]
+    operations = [
+        UpdateOne(
+            {"activity": name, "email": email},
+            {"$setOnInsert": enrollment_document(name, email)},
+            upsert=True
+        )
+        for email in activity.get("participants") or []
+    ]
+    if operations:
+        await enrollments_collection.bulk_write(operations, ordered=False)
+
+    await activities_collection.update_one(
+        {"_id": name},
+        {
+            "$set": {"participant_count": await count_enrollments(name)},
+            "$unset": {"participants": ""}
+        }
+    )
+    return len(operations)
+
+
+async def recount():
+    """Reset every activity's participant_count from the enrollments collection"""
+    counts = {}
+    pipeline = [{"$group": {"_id": "$activity", "count": {"$sum": 1}}}]
+    async for doc in await enrollments_collection.aggregate(pipeline):
+        counts[doc["_id"]] = doc["count"]
+
+    operations = []
+    async for activity in activities_collection.find({}, {"participant_count": 1}):
+        count = counts.get(activity["_id"], 0)
+        if activity.get("participant_count") != count:
+            operations.append(UpdateOne(
+                {"_id": activity["_id"]}, {"$set": {"participant_count": count}}))
+
+    if operations:
+        await activities_collection.bulk_write(operations, ordered=False)
+    return len(operations)
+
+
+async def migrate_all() -> Tuple[int, int]:
+    """Migrate every activity that still has a participants array.
+
+    Returns how many participants were copied from how many activities. The
+    unique index on enrollments must already exist so that reruns, or
+    several workers starting at once, cannot duplicate rows.
+    """
+    activities = migrated = 0
+    async for activity in activities_collection.find(
+            {"participants": {"$exists": True}}, {"participants": 1}):
+        migrated += await migrate_activity(activity)
+        activities += 1
+    return migrated, activities
+
+
+async def main(args: argparse.Namespace):
+    await ensure_indexes()
+
+    migrated, activities = await migrate_all()
+    print(f"Migrated {migrated} participants from {activities} activities")
+
+    if args.recount:
+        print(f"Corrected participant_count on {await recount()} activities")
+
+    await client.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--recount", action="store_true",
+                        help="Recompute participant_count for every activity")
+    asyncio.run(main(parser.parse_args()))
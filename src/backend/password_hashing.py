@@ -0,0 +1,52 @@
+"""
+Argon2 hashing for the High School Management System API
+
+These functions run inside the password pool's worker processes, so this
+module imports nothing from the app: a spawned worker loads only this
+module and argon2, not the routers or the Mongo client.
+"""
+
+import os
+from typing import Tuple
+
+from argon2 import PasswordHasher, exceptions as argon2_exceptions
+
+password_hasher = PasswordHasher(
+    time_cost=int(os.environ.get("ARGON2_TIME_COST", "3")),
+    memory_cost=int(os.environ.get("ARGON2_MEMORY_COST", "65536")),
+    parallelism=int(os.environ.get("ARGON2_PARALLELISM", "4"))
+)
+
+
+def hash_password(password):
+    """Hash password using Argon2"""
+    return password_hasher.hash(password)
+
+
+def verify_password(hashed_password: str, plain_password: str) -> bool:
+    """Verify a plain password against an Argon2 hashed password.
+
+    Returns True when the password matches, False otherwise.
+    """
+    try:
+        password_hasher.verify(hashed_password, plain_password)
+        return True
+    except argon2_exceptions.VerifyMismatchError:
+        return False
+    except Exception:
+        # For any other exception (e.g., invalid hash), treat as non-match
+        return False
+
+
+def verify_and_check_rehash(hashed_password: str, plain_password: str) -> Tuple[bool, bool]:
+    """Verify a password and report whether its hash uses outdated parameters.
+
+    Returns (matches, needs_rehash).
+    """
+    if not verify_password(hashed_password, plain_password):
+        return False, False
+    return True, password_hasher.check_needs_rehash(hashed_password)
+
+
+def warm_up():
+    """No-op job that makes a worker process load this module"""
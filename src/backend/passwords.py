@@ -0,0 +1,85 @@
+"""
+Password hashing for the High School Management System API
+
+The Argon2 functions live in password_hashing, which imports nothing from the
+app, so the pool's workers stay light. Login verification runs them in a dedicated, bounded process pool so a burst
+of logins cannot starve the event loop. Requests that arrive while the pool
+is full are rejected instead of queued without limit. The pool is started
+with the app, so the first logins do not wait for worker processes to spawn.
+"""
+
+import asyncio
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Optional
+
+from .metrics import password_job_duration
+from .password_hashing import warm_up
+
+
+class PoolSaturated(Exception):
+    """Raised when the password pool has no room for another job"""
+
+
+class PasswordPool:
+    """Bounded process pool for Argon2 work"""
+
+    def __init__(self, workers: int, queue_depth: int):
+        self.workers = workers
+        # Jobs running plus jobs waiting for a worker
+        self.max_pending = workers + queue_depth
+        self.pending = 0
+        self.rejected = 0
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # spawn rather than fork: the parent has an event loop and the
+            # Mongo client's background threads running
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._executor
+
+    async def start(self):
+        """Spawn every worker process - call at startup"""
+        loop = asyncio.get_running_loop()
+        executor = self._get_executor()
+        # Workers are spawned as jobs arrive, one per job while none is idle
+        await asyncio.gather(*[
+            loop.run_in_executor(executor, warm_up) for _ in range(self.workers)])
+
+    async def run(self, fn: Callable[..., Any], *args) -> Any:
+        """Run fn(*args) in the pool, or raise PoolSaturated if it is full"""
+        if self.pending >= self.max_pending:
+            self.rejected += 1
+            raise PoolSaturated()
+
+        self.pending += 1
+        started = time.perf_counter()
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._get_executor(), fn, *args)
+        finally:
+            self.pending -= 1
+            password_job_duration.observe(
+                (fn.__name__,), time.perf_counter() - started)
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(cancel_futures=True)
+            self._executor = None
+
+
+_workers = int(os.environ.get("PASSWORD_POOL_WORKERS", str(min(4, os.cpu_count() or 1))))
+
+password_pool = PasswordPool(
+    workers=_workers,
+    queue_depth=int(os.environ.get("PASSWORD_POOL_QUEUE_DEPTH", str(_workers * 4)))
+)
+
+# Seconds a client shed by the password pool should wait before retrying
+LOGIN_RETRY_AFTER_SECONDS = int(os.environ.get("LOGIN_RETRY_AFTER_SECONDS", "2"))
@@ -1,3 +1,7 @@
 from . import activities
 from . import auth
-from . import announcements
\ No newline at end of file
+from . import announcements
+from . import events
+from . import metrics
+from . import students
+from . import changes
\ No newline at end of file
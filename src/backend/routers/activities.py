@@ -2,137 +2,337 @@
 Endpoints for the High School Management System API
 """
 
-from fastapi import APIRouter, HTTPException, Query
-from fastapi.responses import RedirectResponse
+import re
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import RedirectResponse, StreamingResponse
 from typing import Dict, Any, Optional, List
 
-from ..database import activities_collection, teachers_collection
+from ..database import (activities_collection, activities_read_collection,
+                        enrollments_read_collection)
+from ..sessions import require_teacher
+from ..cache import bump_version, cached_response, response_cache
+from ..bulk_enrollment import bulk_enroll
+from ..events import publish_activity_counts
+from ..enrollments import (EXPORT_FIELDS, PARTICIPANT_COUNT, activity_view_stages, enroll,
+                           roster_export_stages, roster_page, unenroll)
+from ..schedule import schedule_index
+from ..day_summary import load_day_summary
+from ..rush import RUSH_MODE, signup_batcher
+from ..serialization import iter_csv, iter_ndjson, streaming_json_object
 
 router = APIRouter(
     prefix="/activities",
     tags=["activities"]
 )
 
+# Listing projection that reports the participant counter instead of the roster
+SUMMARY_PROJECTION = {
+    "description": 1,
+    "schedule": 1,
+    "schedule_details": 1,
+    "category": 1,
+    "max_participants": 1,
+    "participant_count": PARTICIPANT_COUNT,
+    "spots_left": {"$subtract": ["$max_participants", PARTICIPANT_COUNT]}
+}
+
+# HTTP errors for the non-success outcomes of enroll(), unenroll() and rush
+# mode signups. A detail of None sends the result's own detail.
+SIGNUP_ERRORS = {
+    "not_found": (404, "Activity not found"),
+    "duplicate": (400, "Already signed up for this activity"),
+    "full": (400, "Activity is full"),
+    "conflict": (409, None),
+    "error": (500, "Signup could not be saved")
+}
+UNREGISTER_ERRORS = {
+    "not_found": (404, "Activity not found"),
+    "not_registered": (400, "Not registered for this activity")
+}
+
+
+def raise_for_status(result: Dict[str, Any], errors: Dict[str, tuple]):
+    """Raise the HTTP error matching an enrollment result, if it is one"""
+    if result["status"] in errors:
+        status_code, detail = errors[result["status"]]
+        raise HTTPException(status_code=status_code, detail=detail or result["detail"])
+
+
+# A single search term up to this long is matched against the start of the
+# words in activity names, so results keep up while a word is being typed.
+# Longer queries go to the text index, which only matches whole words.
+PREFIX_SEARCH_MAX_LENGTH = 4
+
+
+def is_prefix_search(q: Optional[str]) -> bool:
+    term = (q or "").strip()
+    return 0 < len(term) <= PREFIX_SEARCH_MAX_LENGTH and not any(
+        character.isspace() for character in term)
+
+
+def build_activity_query(
+    day: Optional[str] = None,
+    start_time: Optional[str] = None,
+    end_time: Optional[str] = None,
+    q: Optional[str] = None,
+    category: Optional[str] = None
+) -> Dict[str, Any]:
+    """Build the Mongo filter for the activity listing filters"""
+    query = {}
+
+    if day:
+        query["schedule_details.days"] = {"$in": [day]}
+
+    if start_time:
+        query["schedule_details.start_time"] = {"$gte": start_time}
+
+    if end_time:
+        query["schedule_details.end_time"] = {"$lte": end_time}
+
+    if is_prefix_search(q):
+        query["name"] = {"$regex": rf"\b{re.escape(q.strip())}", "$options": "i"}
+    elif q:
+        query["$text"] = {"$search": q}
+
+    if category:
+        query["category"] = category
+
+    return query
+
 
 @router.get("", response_model=Dict[str, Any])
 @router.get("/", response_model=Dict[str, Any])
-def get_activities(
+async def get_activities(
+    request: Request,
     day: Optional[str] = None,
     start_time: Optional[str] = None,
-    end_time: Optional[str] = None
+    end_time: Optional[str] = None,
+    q: Optional[str] = None,
+    category: Optional[str] = None,
+    summary: bool = False,
+    stream: bool = False
 ) -> Dict[str, Any]:
     """
-    Get all activities with their details, with optional filtering by day and time
+    Get all activities with their details, with optional filtering by day, time, text and category
 
     - day: Filter activities occurring on this day (e.g., 'Monday', 'Tuesday')
     - start_time: Filter activities starting at or after this time (24-hour format, e.g., '14:30')
     - end_time: Filter activities ending at or before this time (24-hour format, e.g., '17:00')
+    - q: Search words in the activity name, description and schedule; best matches come first.
+      A single term of up to 4 characters matches the start of any word in the name instead
+    - category: Filter activities in this category (e.g., 'sports', 'arts', 'technology')
+    - summary: If True, omit the participants list and return participant_count and spots_left instead
+    - stream: If True, stream the activities straight from the database cursor, bypassing the
+      cache. Use it for very large catalogues.
     """
     # Build the query based on provided filters
-    query = {}
+    query = build_activity_query(day, start_time, end_time, q, category)
 
-    if day:
-        query["schedule_details.days"] = {"$in": [day]}
+    pipeline = [{"$match": query}]
+    if q and not is_prefix_search(q):
+        pipeline.append({"$sort": {"score": {"$meta": "textScore"}}})
 
-    if start_time:
-        query["schedule_details.start_time"] = {"$gte": start_time}
+    if summary:
+        pipeline.append({"$project": SUMMARY_PROJECTION})
+    else:
+        # Rebuild the participants list from enrollments
+        pipeline += activity_view_stages()
 
-    if end_time:
-        query["schedule_details.end_time"] = {"$lte": end_time}
+    if stream:
+        return streaming_json_object(await activities_read_collection.aggregate(pipeline))
+
+    async def load_activities() -> Dict[str, Any]:
+        # Fill the cache from the primary: a fill right after bump_version()
+        # could otherwise cache a lagging secondary's data under the new
+        # version for the whole TTL
+        activities = {}
+        async for activity in await activities_collection.aggregate(pipeline):
+            name = activity.pop('_id')
+            activities[name] = activity
 
-    # Query the database
-    activities = {}
-    for activity in activities_collection.find(query):
-        name = activity.pop('_id')
-        activities[name] = activity
+        return activities
 
-    return activities
+    cache_key = ("activities", day, start_time, end_time, q, category, summary)
+    return await cached_response(request, cache_key, load_activities)
 
 
 @router.get("/days", response_model=List[str])
-def get_available_days() -> List[str]:
-    """Get a list of all days that have activities scheduled"""
-    # Aggregate to get unique days across all activities
-    pipeline = [
-        {"$unwind": "$schedule_details.days"},
-        {"$group": {"_id": "$schedule_details.days"}},
-        {"$sort": {"_id": 1}}  # Sort days alphabetically
-    ]
+async def get_available_days(request: Request) -> List[str]:
+    """Get a list of all days that have activities scheduled, in calendar order"""
+    async def load_days() -> List[str]:
+        summary = await load_day_summary()
+        return [entry["day"] for entry in summary["days"]]
 
-    days = []
-    for day_doc in activities_collection.aggregate(pipeline):
-        days.append(day_doc["_id"])
+    return await cached_response(request, ("days",), load_days)
 
-    return days
 
+@router.get("/days/summary", response_model=Dict[str, Any])
+async def get_day_summary(request: Request) -> Dict[str, Any]:
+    """
+    Get the number of activities on each day, with the day's earliest start and latest end time
 
-@router.post("/{activity_name}/signup")
-def signup_for_activity(activity_name: str, email: str, teacher_username: Optional[str] = Query(None)):
-    """Sign up a student for an activity - requires teacher authentication"""
-    # Check teacher authentication
-    if not teacher_username:
-        raise HTTPException(
-            status_code=401, detail="Authentication required for this action")
-
-    teacher = teachers_collection.find_one({"_id": teacher_username})
-    if not teacher:
-        raise HTTPException(
-            status_code=401, detail="Invalid teacher credentials")
-
-    # Get the activity
-    activity = activities_collection.find_one({"_id": activity_name})
-    if not activity:
+    `total` is the number of activities; `days` lists the days that have
+    activities, in calendar order.
+    """
+    return await cached_response(request, ("days", "summary"), load_day_summary)
+
+
+@router.get("/conflicts", response_model=Dict[str, Any])
+async def get_schedule_conflicts(
+    email: str,
+    teacher: Dict[str, Any] = Depends(require_teacher)
+) -> Dict[str, Any]:
+    """
+    Get the activities whose sessions overlap the ones a student is signed up for - requires teacher authentication
+
+    - email: The student to check
+
+    `conflicts` maps each overlapping activity to the student's activities it
+    clashes with. Two of the student's own activities that overlap are listed too.
+    """
+    enrolled = [doc["activity"] async for doc in enrollments_read_collection.find(
+        {"email": email}, {"_id": 0, "activity": 1})]
+
+    await schedule_index.refresh_if_stale()
+    return {"email": email, "conflicts": schedule_index.conflicts_for(enrolled)}
+
+
+@router.get("/export")
+async def export_rosters(
+    format: str = Query("csv", pattern="^(csv|ndjson)$"),
+    day: Optional[str] = None,
+    start_time: Optional[str] = None,
+    end_time: Optional[str] = None,
+    category: Optional[str] = None,
+    teacher: Dict[str, Any] = Depends(require_teacher)
+) -> StreamingResponse:
+    """
+    Download every activity's roster, one row per enrolled student - requires teacher authentication
+
+    - format: 'csv' (with a header row) or 'ndjson' (one JSON object per line)
+    - day, start_time, end_time, category: Only export matching activities, as in GET /activities
+
+    Each row has the activity, the student's email, when they enrolled, and the
+    activity's category and schedule. Rows are streamed from the database
+    cursor, so the export never holds the whole district in memory.
+    """
+    query = build_activity_query(day, start_time, end_time, category=category)
+    pipeline = [{"$match": query}, *roster_export_stages()]
+    cursor = await activities_read_collection.aggregate(pipeline)
+
+    if format == "csv":
+        body, media_type = iter_csv(cursor, EXPORT_FIELDS), "text/csv"
+    else:
+        body, media_type = iter_ndjson(cursor), "application/x-ndjson"
+
+    return StreamingResponse(body, media_type=media_type, headers={
+        "Content-Disposition": f'attachment; filename="rosters.{format}"'
+    })
+
+
+@router.get("/cache-stats", response_model=Dict[str, int])
+async def get_cache_stats() -> Dict[str, int]:
+    """Get hit/miss counters and the current data version of the listing cache"""
+    return response_cache.stats()
+
+
+@router.post("/bulk-signup", response_model=Dict[str, Any])
+async def bulk_signup(
+    request: Request,
+    format: str = Query("csv", pattern="^(csv|ndjson)$"),
+    teacher: Dict[str, Any] = Depends(require_teacher)
+) -> Dict[str, Any]:
+    """
+    Sign up many students at once from a streamed upload - requires teacher authentication
+
+    - format: 'csv' for `activity,email` lines (an optional header row is skipped),
+      or 'ndjson' for one `{"activity": ..., "email": ...}` object per line
+
+    Rows are validated as they arrive and enrolled in batches. Capacity is
+    enforced. Rows whose activity overlaps one the student is already in, or
+    one an earlier row signs them up for, are rejected as `conflict`. The
+    response has per-status counts, the activities that gained participants,
+    and every row that was not enrolled with its row number and the reason.
+
+    Overlaps are checked again once the batch is written, so a signup for the
+    same student landing at the same moment cannot double-book them; one or
+    both of the two is rejected as `conflict`.
+    """
+    summary = await bulk_enroll(request.stream(), format)
+
+    if summary["activities"]:
+        bump_version()
+
+        # Push the new counts of every activity that changed
+        pipeline = [
+            {"$match": {"_id": {"$in": summary["activities"]}}},
+            {"$project": SUMMARY_PROJECTION}
+        ]
+        async for activity in await activities_collection.aggregate(pipeline):
+            publish_activity_counts(
+                activity["_id"], activity["participant_count"],
+                activity["max_participants"])
+
+    return summary
+
+
+@router.get("/{activity_name}/participants", response_model=Dict[str, Any])
+async def get_activity_participants(
+    activity_name: str,
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=500)
+) -> Dict[str, Any]:
+    """
+    Get one page of an activity's participants, ordered by email
+
+    - cursor: Return participants after this email (use next_cursor from the previous page)
+    - limit: Maximum number of participants to return
+    """
+    # Walks the (activity, email) index. Fetch one extra row to know whether
+    # another page exists.
+    participants = await roster_page(activity_name, cursor, limit + 1)
+
+    # An empty page is either the end of the roster or an unknown activity
+    if not participants and not await activities_read_collection.count_documents(
+            {"_id": activity_name}, limit=1):
         raise HTTPException(status_code=404, detail="Activity not found")
 
-    # Validate student is not already signed up
-    if email in activity["participants"]:
-        raise HTTPException(
-            status_code=400, detail="Already signed up for this activity")
+    next_cursor = None
+    if len(participants) > limit:
+        participants = participants[:limit]
+        next_cursor = participants[-1]
+
+    return {"participants": participants, "next_cursor": next_cursor}
+
 
-    # Add student to participants
-    result = activities_collection.update_one(
-        {"_id": activity_name},
-        {"$push": {"participants": email}}
-    )
+@router.post("/{activity_name}/signup")
+async def signup_for_activity(activity_name: str, email: str, teacher: Dict[str, Any] = Depends(require_teacher)):
+    """Sign up a student for an activity - requires teacher authentication"""
+    # Both paths reject schedule conflicts (409) once the enrollment is
+    # written, so concurrent signups cannot double-book a student.
+    # In rush mode the signup is written with others queued in the same
+    # few milliseconds
+    if RUSH_MODE:
+        result = await signup_batcher.submit(activity_name, email)
+    else:
+        result = await enroll(activity_name, email)
+    raise_for_status(result, SIGNUP_ERRORS)
 
-    if result.modified_count == 0:
-        raise HTTPException(
-            status_code=500, detail="Failed to update activity")
+    bump_version()
+    publish_activity_counts(
+        activity_name, result["participant_count"], result["max_participants"])
 
     return {"message": f"Signed up {email} for {activity_name}"}
 
 
 @router.post("/{activity_name}/unregister")
-def unregister_from_activity(activity_name: str, email: str, teacher_username: Optional[str] = Query(None)):
+async def unregister_from_activity(activity_name: str, email: str, teacher: Dict[str, Any] = Depends(require_teacher)):
     """Remove a student from an activity - requires teacher authentication"""
-    # Check teacher authentication
-    if not teacher_username:
-        raise HTTPException(
-            status_code=401, detail="Authentication required for this action")
-
-    teacher = teachers_collection.find_one({"_id": teacher_username})
-    if not teacher:
-        raise HTTPException(
-            status_code=401, detail="Invalid teacher credentials")
-
-    # Get the activity
-    activity = activities_collection.find_one({"_id": activity_name})
-    if not activity:
-        raise HTTPException(status_code=404, detail="Activity not found")
-
-    # Validate student is signed up
-    if email not in activity["participants"]:
-        raise HTTPException(
-            status_code=400, detail="Not registered for this activity")
-
-    # Remove student from participants
-    result = activities_collection.update_one(
-        {"_id": activity_name},
-        {"$pull": {"participants": email}}
-    )
+    result = await unenroll(activity_name, email)
+    raise_for_status(result, UNREGISTER_ERRORS)
 
-    if result.modified_count == 0:
-        raise HTTPException(
-            status_code=500, detail="Failed to update activity")
+    bump_version()
+    publish_activity_counts(
+        activity_name, result["participant_count"], result["max_participants"])
 
     return {"message": f"Unregistered {email} from {activity_name}"}
@@ -2,12 +2,20 @@
 Announcements endpoints for the High School Management System API
 """
 
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from typing import List, Dict, Any, Optional
 from datetime import datetime
+from email.utils import format_datetime, parsedate_to_datetime
 from bson import ObjectId
 
-from ..database import announcements_collection, teachers_collection
+from ..database import announcements_collection, announcements_read_collection
+from ..sessions import require_teacher
+from ..cache import bump_version, etag_matches
+from ..events import publish_announcement
+from ..announcement_snapshot import active_announcements
+from ..serialization import dumps, json_response
+from ..changes import (CHANGE_STAMP, HIDE_CHANGE_FIELDS, insert_stamped, literal_fields,
+                       record_deletion)
 
 router = APIRouter(
     prefix="/announcements",
@@ -17,56 +25,60 @@ router = APIRouter(
 
 @router.get("", response_model=List[Dict[str, Any]])
 @router.get("/", response_model=List[Dict[str, Any]])
-def get_announcements(active_only: bool = Query(True)) -> List[Dict[str, Any]]:
+async def get_announcements(
+    request: Request,
+    active_only: bool = Query(True)
+) -> List[Dict[str, Any]]:
     """
     Get all announcements, optionally filtered to show only active ones
     
-    - active_only: If True, only return announcements that are currently active based on dates
+    - active_only: If True, only return announcements that are currently active based on dates.
+      These are served from an in-memory snapshot with ETag and Last-Modified headers.
     """
-    announcements = []
-    current_date = datetime.now().date().isoformat()
-    
-    for announcement in announcements_collection.find():
-        # Convert ObjectId to string for JSON serialization
-        announcement["id"] = str(announcement.pop("_id"))
-        
-        if active_only:
-            # Check if announcement is active
-            start_date = announcement.get("start_date")
-            expiration_date = announcement.get("expiration_date")
-            
-            # If start_date exists and is in the future, skip
-            if start_date and start_date > current_date:
-                continue
-            
-            # If expiration_date is in the past, skip
-            if expiration_date and expiration_date < current_date:
-                continue
-        
-        announcements.append(announcement)
-    
-    return announcements
+    if active_only:
+        body = await active_announcements.get_body()
+        last_modified = active_announcements.last_modified
+        headers = {
+            "ETag": active_announcements.etag,
+            "Last-Modified": format_datetime(last_modified, usegmt=True),
+            "Cache-Control": "no-cache"
+        }
+
+        # If-None-Match takes precedence: the ETag changes with the content,
+        # Last-Modified only to the second
+        if_modified_since = request.headers.get("if-modified-since")
+        if "if-none-match" in request.headers:
+            if etag_matches(request, active_announcements.etag):
+                return Response(status_code=304, headers=headers)
+        elif if_modified_since:
+            try:
+                if parsedate_to_datetime(if_modified_since) >= last_modified:
+                    return Response(status_code=304, headers=headers)
+            except (TypeError, ValueError):
+                pass  # Ignore malformed dates and send the full response
+
+        return json_response(body, headers)
+
+    # Let the server turn _id into a string id
+    pipeline = [
+        {"$set": {"id": {"$toString": "$_id"}}},
+        {"$unset": ["_id", *HIDE_CHANGE_FIELDS]}
+    ]
+    announcements = [announcement async for announcement
+                     in await announcements_read_collection.aggregate(pipeline)]
+
+    return json_response(dumps(announcements))
 
 
 @router.post("", response_model=Dict[str, Any])
 @router.post("/", response_model=Dict[str, Any])
-def create_announcement(
+async def create_announcement(
     message: str,
     expiration_date: str,
     start_date: Optional[str] = None,
-    teacher_username: Optional[str] = Query(None)
+    teacher: Dict[str, Any] = Depends(require_teacher)
 ) -> Dict[str, Any]:
     """Create a new announcement - requires teacher authentication"""
-    # Check teacher authentication
-    if not teacher_username:
-        raise HTTPException(
-            status_code=401, detail="Authentication required for this action")
-    
-    teacher = teachers_collection.find_one({"_id": teacher_username})
-    if not teacher:
-        raise HTTPException(
-            status_code=401, detail="Invalid teacher credentials")
-    
     # Validate dates
     try:
         exp_date = datetime.fromisoformat(expiration_date).date()
@@ -83,42 +95,36 @@ def create_announcement(
             detail="Invalid date format. Use YYYY-MM-DD"
         )
     
-    # Create announcement document
+    # Create announcement document, storing plain dates even when a time was
+    # sent: the snapshot compares and parses them as YYYY-MM-DD
     announcement = {
         "message": message,
-        "expiration_date": expiration_date
+        "expiration_date": exp_date.isoformat()
     }
     
     if start_date:
-        announcement["start_date"] = start_date
+        announcement["start_date"] = st_date.isoformat()
     
     # Insert into database
-    result = announcements_collection.insert_one(announcement)
+    announcement_id = await insert_stamped(announcements_collection, announcement)
+    bump_version()
+    active_announcements.invalidate()
     
     # Return created announcement
-    announcement["id"] = str(result.inserted_id)
+    announcement["id"] = str(announcement_id)
+    publish_announcement("created", announcement)
     return announcement
 
 
 @router.put("/{announcement_id}", response_model=Dict[str, Any])
-def update_announcement(
+async def update_announcement(
     announcement_id: str,
     message: str,
     expiration_date: str,
     start_date: Optional[str] = None,
-    teacher_username: Optional[str] = Query(None)
+    teacher: Dict[str, Any] = Depends(require_teacher)
 ) -> Dict[str, Any]:
     """Update an existing announcement - requires teacher authentication"""
-    # Check teacher authentication
-    if not teacher_username:
-        raise HTTPException(
-            status_code=401, detail="Authentication required for this action")
-    
-    teacher = teachers_collection.find_one({"_id": teacher_username})
-    if not teacher:
-        raise HTTPException(
-            status_code=401, detail="Invalid teacher credentials")
-    
     # Validate dates
     try:
         exp_date = datetime.fromisoformat(expiration_date).date()
@@ -138,54 +144,54 @@ def update_announcement(
     # Update announcement
     update_data = {
         "message": message,
-        "expiration_date": expiration_date
+        "expiration_date": exp_date.isoformat()
     }
     
-    update_operations = {"$set": update_data}
-    
     if start_date:
-        update_operations["$set"]["start_date"] = start_date
-    else:
+        update_data["start_date"] = st_date.isoformat()
+    
+    update_pipeline = [{"$set": {**literal_fields(update_data), **CHANGE_STAMP}}]
+    if not start_date:
         # Remove start_date if it's being cleared
-        update_operations["$unset"] = {"start_date": ""}
+        update_pipeline.append({"$unset": "start_date"})
     
-    result = announcements_collection.update_one(
+    result = await announcements_collection.update_one(
         {"_id": ObjectId(announcement_id)},
-        update_operations
+        update_pipeline
     )
     
     if result.matched_count == 0:
         raise HTTPException(status_code=404, detail="Announcement not found")
+
+    bump_version()
+    active_announcements.invalidate()
     
     # Fetch and return updated announcement
-    announcement = announcements_collection.find_one({"_id": ObjectId(announcement_id)})
+    announcement = await announcements_collection.find_one(
+        {"_id": ObjectId(announcement_id)}, HIDE_CHANGE_FIELDS)
     if announcement:
         announcement["id"] = str(announcement.pop("_id"))
+        publish_announcement("updated", announcement)
         return announcement
     
     raise HTTPException(status_code=404, detail="Announcement not found")
 
 
 @router.delete("/{announcement_id}")
-def delete_announcement(
+async def delete_announcement(
     announcement_id: str,
-    teacher_username: Optional[str] = Query(None)
+    teacher: Dict[str, Any] = Depends(require_teacher)
 ) -> Dict[str, str]:
     """Delete an announcement - requires teacher authentication"""
-    # Check teacher authentication
-    if not teacher_username:
-        raise HTTPException(
-            status_code=401, detail="Authentication required for this action")
-    
-    teacher = teachers_collection.find_one({"_id": teacher_username})
-    if not teacher:
-        raise HTTPException(
-            status_code=401, detail="Invalid teacher credentials")
-    
     # Delete announcement
-    result = announcements_collection.delete_one({"_id": ObjectId(announcement_id)})
+    result = await announcements_collection.delete_one({"_id": ObjectId(announcement_id)})
     
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="Announcement not found")
+
+    await record_deletion("announcements", announcement_id)
+    bump_version()
+    active_announcements.invalidate()
+    publish_announcement("deleted", {"id": announcement_id})
     
     return {"message": "Announcement deleted successfully"}
@@ -2,10 +2,14 @@
 Authentication endpoints for the High School Management System API
 """
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException
 from typing import Dict, Any
 
-from ..database import teachers_collection, verify_password
+from ..database import teachers_collection
+from ..password_hashing import hash_password, verify_and_check_rehash
+from ..passwords import LOGIN_RETRY_AFTER_SECONDS, PoolSaturated, password_pool
+from ..sessions import (invalidate_teacher, issue_token, principal_cache,
+                        require_teacher, to_principal)
 
 router = APIRouter(
     prefix="/auth",
@@ -14,34 +18,54 @@ router = APIRouter(
 
 
 @router.post("/login")
-def login(username: str, password: str) -> Dict[str, Any]:
-    """Login a teacher account"""
+async def login(username: str, password: str) -> Dict[str, Any]:
+    """Login a teacher account and issue a session token
+
+    Send the returned token as `Authorization: Bearer <token>` on requests
+    that require teacher authentication.
+    """
     # Find the teacher in the database
-    teacher = teachers_collection.find_one({"_id": username})
+    teacher = await teachers_collection.find_one({"_id": username})
 
-    # Verify password using Argon2 verifier from database.py
-    if not teacher or not verify_password(teacher.get("password", ""), password):
+    if not teacher:
         raise HTTPException(
             status_code=401, detail="Invalid username or password")
 
-    # Return teacher information (excluding password)
-    return {
-        "username": teacher["username"],
-        "display_name": teacher["display_name"],
-        "role": teacher["role"]
-    }
+    # Verify password in the Argon2 process pool, shedding load when it is full
+    try:
+        matches, needs_rehash = await password_pool.run(
+            verify_and_check_rehash, teacher.get("password", ""), password)
+    except PoolSaturated:
+        raise HTTPException(
+            status_code=503,
+            detail="Too many login attempts in progress, please try again shortly",
+            headers={"Retry-After": str(LOGIN_RETRY_AFTER_SECONDS)})
 
+    if not matches:
+        raise HTTPException(
+            status_code=401, detail="Invalid username or password")
 
-@router.get("/check-session")
-def check_session(username: str) -> Dict[str, Any]:
-    """Check if a session is valid by username"""
-    teacher = teachers_collection.find_one({"_id": username})
+    # Upgrade hashes created with older Argon2 parameters. This is best
+    # effort: if the pool is busy the hash is upgraded on a later login.
+    if needs_rehash:
+        try:
+            new_hash = await password_pool.run(hash_password, password)
+        except PoolSaturated:
+            new_hash = None
 
-    if not teacher:
-        raise HTTPException(status_code=404, detail="Teacher not found")
+        if new_hash:
+            await teachers_collection.update_one(
+                {"_id": username}, {"$set": {"password": new_hash}})
+            invalidate_teacher(username)
+
+    # Return teacher information (excluding password) with a session token
+    principal = to_principal(teacher)
+    principal_cache.put(username, principal)
+
+    return {**principal, "token": issue_token(username)}
 
-    return {
-        "username": teacher["username"],
-        "display_name": teacher["display_name"],
-        "role": teacher["role"]
-    }
+
+@router.get("/check-session")
+async def check_session(teacher: Dict[str, Any] = Depends(require_teacher)) -> Dict[str, Any]:
+    """Check if the session token in the Authorization header is valid"""
+    return teacher
@@ -0,0 +1,88 @@
+"""
+Delta sync endpoint for the High School Management System API
+"""
+
+import time
+from fastapi import APIRouter, Query
+from typing import Dict, Any
+
+from ..changes import HIDE_CHANGE_FIELDS, SETTLED
+from ..database import (DELETIONS_RETENTION_SECONDS, activities_collection,
+                        announcements_collection, deletions_collection)
+from ..enrollments import activity_view_stages
+from ..serialization import dumps, json_response
+
+router = APIRouter(
+    prefix="/changes",
+    tags=["changes"]
+)
+
+
+@router.get("", response_model=Dict[str, Any])
+@router.get("/", response_model=Dict[str, Any])
+async def get_changes(since: int = Query(0, ge=0)):
+    """
+    Get the activities and announcements changed or deleted since a change sequence number
+
+    - since: next_since from the previous response, or 0 for everything
+
+    Activities are shaped as in the full GET /activities listing and
+    announcements as in GET /announcements?active_only=false. Apply them over
+    a local copy, drop the ids under `deleted`, then poll again with
+    next_since. The most recent changes can be sent more than once.
+
+    If `reset` is true, since was older than the deletion tombstones are kept
+    for: the response holds everything, and the client should replace its
+    copy instead of applying the response over it.
+    """
+    # Tombstones are kept for days, so the app host's clock is close enough
+    # to the server's here
+    reset = 0 < since < (time.time() - DELETIONS_RETENTION_SECONDS) * 1000
+    if reset:
+        since = 0
+
+    # Read from the primary: a lagging secondary could hide a change the
+    # client would then skip past
+    newer = {"change_seq": {"$gt": since}}
+    next_since = since
+
+    def settle(change: Dict[str, Any]):
+        # Only move past changes old enough that no earlier number is in flight
+        nonlocal next_since
+        if change["settled"]:
+            next_since = max(next_since, change["change_seq"])
+
+    def changes_after(*stages: Dict[str, Any]):
+        return [
+            {"$match": newer},
+            {"$sort": {"change_seq": 1}},
+            {"$set": {"_change": {"change_seq": "$change_seq", "settled": SETTLED}}},
+            *stages
+        ]
+
+    activities = {}
+    async for activity in await activities_collection.aggregate(
+            changes_after(*activity_view_stages())):
+        settle(activity.pop("_change"))
+        activities[activity.pop("_id")] = activity
+
+    announcements = []
+    async for announcement in await announcements_collection.aggregate(changes_after(
+            {"$set": {"id": {"$toString": "$_id"}}},
+            {"$unset": ["_id", *HIDE_CHANGE_FIELDS]})):
+        settle(announcement.pop("_change"))
+        announcements.append(announcement)
+
+    deleted = {"activities": [], "announcements": []}
+    async for deletion in await deletions_collection.aggregate(changes_after()):
+        settle(deletion["_change"])
+        deleted[deletion["kind"]].append(deletion["record_id"])
+
+    return json_response(dumps({
+        "since": since,
+        "next_since": next_since,
+        "reset": reset,
+        "activities": activities,
+        "announcements": announcements,
+        "deleted": deleted
+    }))
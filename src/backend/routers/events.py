@@ -0,0 +1,55 @@
+"""
+Server-Sent Events endpoint for the High School Management System API
+"""
+
+import asyncio
+import json
+from typing import AsyncIterator
+
+from fastapi import APIRouter
+from fastapi.responses import StreamingResponse
+
+from ..events import broker
+
+router = APIRouter(
+    prefix="/events",
+    tags=["events"]
+)
+
+# Comment lines keep idle connections open through proxies
+HEARTBEAT_SECONDS = 15
+
+
+async def event_stream() -> AsyncIterator[str]:
+    subscription = broker.subscribe()
+    try:
+        # Tell the browser how long to wait before reconnecting
+        yield "retry: 3000\n\n"
+
+        while not subscription.overflowed:
+            try:
+                event = await asyncio.wait_for(
+                    subscription.queue.get(), timeout=HEARTBEAT_SECONDS)
+            except asyncio.TimeoutError:
+                yield ": keep-alive\n\n"
+                continue
+
+            yield f"event: {event['type']}\ndata: {json.dumps(event)}\n\n"
+    finally:
+        broker.unsubscribe(subscription)
+
+
+@router.get("")
+@router.get("/")
+async def stream_events() -> StreamingResponse:
+    """
+    Stream activity and announcement changes as Server-Sent Events
+
+    - `activity` events carry an activity's name, participant_count and spots_left
+    - `announcement` events carry an action (created, updated or deleted) and the announcement
+    """
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
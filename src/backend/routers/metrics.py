@@ -0,0 +1,55 @@
+"""
+Metrics endpoint for the High School Management System API
+"""
+
+from typing import List, Tuple
+
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from ..admission import limiters
+from ..cache import response_cache
+from ..events import broker
+from ..metrics import register_gauges, render_prometheus
+from ..passwords import password_pool
+from ..rush import signup_batcher
+
+router = APIRouter(
+    prefix="/metrics",
+    tags=["metrics"]
+)
+
+
+def collect_gauges() -> List[Tuple[str, str, float]]:
+    """Point-in-time values from the caches, password pool, signup queue, event broker
+    and admission control"""
+    cache_stats = response_cache.stats()
+    admission = []
+    for name, limiter in limiters.items():
+        admission += [
+            (f"admission_{name}_in_flight", f"Requests running in the {name} group",
+             limiter.in_flight),
+            (f"admission_{name}_queued", f"Requests waiting for a slot in the {name} group",
+             limiter.queued)
+        ]
+    return admission + [
+        ("response_cache_hits", "Listing cache hits since startup", cache_stats["hits"]),
+        ("response_cache_misses", "Listing cache misses since startup", cache_stats["misses"]),
+        ("response_cache_entries", "Entries in the listing cache", cache_stats["entries"]),
+        ("password_pool_pending", "Argon2 jobs running or queued", password_pool.pending),
+        ("password_pool_rejected", "Logins shed because the Argon2 pool was full",
+         password_pool.rejected),
+        ("signup_rush_pending", "Signups queued for the next rush-mode flush",
+         signup_batcher.pending),
+        ("event_stream_subscribers", "Open /events connections", broker.subscriber_count)
+    ]
+
+
+register_gauges(collect_gauges)
+
+
+@router.get("", response_class=PlainTextResponse)
+async def get_metrics() -> str:
+    """Get request, MongoDB and Argon2 metrics in the Prometheus text format"""
+    return PlainTextResponse(
+        render_prometheus(), media_type="text/plain; version=0.0.4")
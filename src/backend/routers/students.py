@@ -0,0 +1,87 @@
+"""
+Student lookup endpoints for the High School Management System API
+"""
+
+from fastapi import APIRouter, Body, Depends
+from typing import Dict, Any, List
+
+from ..database import activities_collection, enrollments_read_collection
+from ..schedule import weekly_schedule
+from ..sessions import require_teacher
+
+router = APIRouter(
+    prefix="/students",
+    tags=["students"]
+)
+
+# Upper bound on the emails accepted by the batch lookup
+MAX_BATCH_EMAILS = 1000
+
+
+async def load_student_activities(emails: List[str]) -> Dict[str, Dict[str, Any]]:
+    """Return each student's activities, keyed by email then activity name.
+
+    One aggregation walks the (email, activity) index and joins the activity
+    details, however many students are asked for.
+    """
+    pipeline = [
+        {"$match": {"email": {"$in": emails}}},
+        {"$lookup": {
+            "from": activities_collection.name,
+            "localField": "activity",
+            "foreignField": "_id",
+            "pipeline": [{"$project": {
+                "_id": 0,
+                "description": 1,
+                "schedule": 1,
+                "schedule_details": 1,
+                "category": 1
+            }}],
+            "as": "details"
+        }},
+        {"$unwind": "$details"},
+        {"$sort": {"email": 1, "activity": 1}}
+    ]
+
+    students: Dict[str, Dict[str, Any]] = {email: {} for email in emails}
+    async for doc in await enrollments_read_collection.aggregate(pipeline):
+        students[doc["email"]][doc["activity"]] = doc["details"]
+    return students
+
+
+def student_view(email: str, activities: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "email": email,
+        "activities": activities,
+        "weekly_schedule": weekly_schedule(activities)
+    }
+
+
+@router.get("/{email}/activities", response_model=Dict[str, Any])
+async def get_student_activities(
+    email: str,
+    teacher: Dict[str, Any] = Depends(require_teacher)
+) -> Dict[str, Any]:
+    """Get the activities a student is signed up for and their weekly schedule - requires teacher authentication"""
+    students = await load_student_activities([email])
+    return student_view(email, students[email])
+
+
+@router.post("/activities", response_model=Dict[str, Any])
+async def get_many_student_activities(
+    emails: List[str] = Body(..., embed=True, min_length=1, max_length=MAX_BATCH_EMAILS),
+    teacher: Dict[str, Any] = Depends(require_teacher)
+) -> Dict[str, Any]:
+    """
+    Get activities and weekly schedules for many students at once - requires teacher authentication
+
+    - emails: JSON body `{"emails": [...]}` listing the students to report on
+
+    Students are returned in the order given. Students with no activities are
+    included with empty results.
+    """
+    unique_emails = list(dict.fromkeys(emails))
+    students = await load_student_activities(unique_emails)
+    return {
+        "students": [student_view(email, students[email]) for email in unique_emails]
+    }
@@ -0,0 +1,96 @@
+"""
+Registration-rush signup batching for the High School Management System API
+
+With RUSH_MODE=1, single signups are not written one at a time. They are
+queued in-process and flushed together every RUSH_FLUSH_MS milliseconds, or
+as soon as RUSH_MAX_BATCH signups are waiting. A flush goes through the bulk
+enrollment path: one query for existing enrollments, one seat reservation
+per activity however many signups it received, and one unordered insert for
+all enrollments. Each caller awaits a future that resolves with its own
+outcome, so responses are as definite as on the direct path.
+"""
+
+import asyncio
+import os
+from typing import Any, Dict, List, Optional, Tuple
+
+from .bulk_enrollment import Row, apply_batch
+
+RUSH_MODE = os.environ.get("RUSH_MODE", "").lower() in ("1", "true", "yes")
+RUSH_FLUSH_MS = float(os.environ.get("RUSH_FLUSH_MS", "20"))
+RUSH_MAX_BATCH = int(os.environ.get("RUSH_MAX_BATCH", "500"))
+
+
+class SignupBatcher:
+    """Collect signups and write them in batches"""
+
+    def __init__(self, flush_seconds: float, max_batch: int):
+        self.flush_seconds = flush_seconds
+        self.max_batch = max_batch
+        self._pending: List[Tuple[Row, "asyncio.Future[Dict[str, Any]]"]] = []
+        self._timer: Optional[asyncio.Task] = None
+        self._flushes: set = set()
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    async def submit(self, activity: str, email: str) -> Dict[str, Any]:
+        """Queue a signup and wait for its outcome.
+
+        Returns a dict shaped like enrollments.enroll()'s result.
+        """
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((Row(len(self._pending) + 1, activity, email), future))
+
+        if len(self._pending) >= self.max_batch:
+            self._start_flush()
+        elif self._timer is None:
+            self._timer = asyncio.create_task(self._flush_later())
+
+        return await future
+
+    async def _flush_later(self):
+        await asyncio.sleep(self.flush_seconds)
+        self._timer = None
+        self._start_flush()
+
+    def _start_flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        batch, self._pending = self._pending, []
+        if batch:
+            # Keep a reference so the task is not garbage collected mid-flush
+            task = asyncio.create_task(self._flush(batch))
+            self._flushes.add(task)
+            task.add_done_callback(self._flushes.discard)
+
+    async def _flush(self, batch: List[Tuple[Row, "asyncio.Future[Dict[str, Any]]"]]):
+        try:
+            counts = await apply_batch([row for row, _ in batch])
+        except Exception as error:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(error)
+            return
+
+        for row, future in batch:
+            # A caller that disconnected has cancelled its future; the
+            # signup itself has still been applied
+            if not future.done():
+                future.set_result({
+                    "status": row.status,
+                    "detail": row.detail,
+                    **counts.get(row.activity, {})
+                })
+
+    async def drain(self):
+        """Flush whatever is queued and wait for in-flight flushes - call at shutdown"""
+        self._start_flush()
+        if self._flushes:
+            await asyncio.gather(*self._flushes, return_exceptions=True)
+
+
+signup_batcher = SignupBatcher(RUSH_FLUSH_MS / 1000, RUSH_MAX_BATCH)
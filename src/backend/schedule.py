@@ -0,0 +1,161 @@
+"""
+Weekly schedule helpers for the High School Management System API
+
+schedule_index keeps every activity's sessions in memory, indexed by day and
+time, so signups can be checked for double-booking without loading the
+student's activities. It is rebuilt from the database at startup and then
+at most every SCHEDULE_INDEX_TTL_SECONDS.
+"""
+
+import bisect
+import os
+import time
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from .database import activities_read_collection, enrollments_collection
+
+SCHEDULE_INDEX_TTL_SECONDS = float(os.environ.get("SCHEDULE_INDEX_TTL_SECONDS", "60"))
+
+# Calendar order, used wherever days are listed
+WEEKDAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+
+
+def weekly_schedule(activities: Dict[str, Dict[str, Any]]) -> Dict[str, List[Dict[str, str]]]:
+    """Lay out activities as sessions per day, days in calendar order and
+    sessions by start time. Days without sessions are omitted."""
+    days: Dict[str, List[Dict[str, str]]] = {day: [] for day in WEEKDAYS}
+
+    for name, details in activities.items():
+        slot = details.get("schedule_details") or {}
+        for day in slot.get("days", []):
+            days.setdefault(day, []).append({
+                "activity": name,
+                "start_time": slot.get("start_time"),
+                "end_time": slot.get("end_time")
+            })
+
+    for sessions in days.values():
+        sessions.sort(key=lambda session: (session["start_time"] or "", session["activity"]))
+
+    return {day: sessions for day, sessions in days.items() if sessions}
+
+
+def to_minutes(clock: str) -> int:
+    """Convert 24-hour 'HH:MM' to minutes after midnight"""
+    hours, minutes = clock.split(":")
+    return int(hours) * 60 + int(minutes)
+
+
+class ScheduleIndex:
+    """Per-day interval index of activity sessions.
+
+    Each day keeps its sessions sorted by start time along with the longest
+    session length, so the sessions overlapping [start, end) are found with
+    two binary searches: they must start after start - longest and before
+    end. Sessions that merely touch (one ends as the other starts) do not
+    overlap.
+    """
+
+    def __init__(self):
+        self._starts: Dict[str, List[int]] = {}
+        self._sessions: Dict[str, List[Tuple[int, int, str]]] = {}
+        self._longest: Dict[str, int] = {}
+        # Activity name -> (days, start, end)
+        self._slots: Dict[str, Tuple[List[str], int, int]] = {}
+        self._built_at: Optional[float] = None
+
+    def upsert(self, name: str, schedule_details: Optional[Dict[str, Any]]):
+        """Add an activity's sessions, replacing any it had before"""
+        self.remove(name)
+        slot = schedule_details or {}
+        try:
+            start, end = to_minutes(slot["start_time"]), to_minutes(slot["end_time"])
+        except (KeyError, TypeError, ValueError):
+            return  # No usable time slot, nothing can conflict with it
+
+        days = list(slot.get("days", []))
+        self._slots[name] = (days, start, end)
+        for day in days:
+            position = bisect.bisect_right(self._starts.setdefault(day, []), start)
+            self._starts[day].insert(position, start)
+            self._sessions.setdefault(day, []).insert(position, (start, end, name))
+            self._longest[day] = max(self._longest.get(day, 0), end - start)
+
+    def remove(self, name: str):
+        """Drop an activity's sessions. The day's longest length is left as is,
+        which only widens later searches slightly."""
+        days, start, end = self._slots.pop(name, ([], 0, 0))
+        for day in days:
+            sessions = self._sessions[day]
+            position = sessions.index((start, end, name), bisect.bisect_left(self._starts[day], start))
+            del sessions[position]
+            del self._starts[day][position]
+
+    def overlapping(self, name: str) -> Set[str]:
+        """Names of the other activities with a session overlapping one of name's"""
+        days, start, end = self._slots.get(name, ([], 0, 0))
+        found = set()
+        for day in days:
+            starts = self._starts[day]
+            low = bisect.bisect_right(starts, start - self._longest[day])
+            high = bisect.bisect_left(starts, end)
+            for other_start, other_end, other in self._sessions[day][low:high]:
+                if other_end > start and other != name:
+                    found.add(other)
+        return found
+
+    def conflicts_for(self, enrolled: List[str]) -> Dict[str, List[str]]:
+        """Map every activity that overlaps one of `enrolled` to the enrolled
+        activities it overlaps. Enrolled activities that overlap each other
+        are included."""
+        conflicts: Dict[str, Set[str]] = {}
+        for name in enrolled:
+            for other in self.overlapping(name):
+                conflicts.setdefault(other, set()).add(name)
+        return {name: sorted(names) for name, names in sorted(conflicts.items())}
+
+    async def rebuild(self):
+        """Reload every activity's time slot from the database"""
+        fresh = ScheduleIndex()
+        async for activity in activities_read_collection.find({}, {"schedule_details": 1}):
+            fresh.upsert(activity["_id"], activity.get("schedule_details"))
+
+        self._starts, self._sessions = fresh._starts, fresh._sessions
+        self._longest, self._slots = fresh._longest, fresh._slots
+        self._built_at = time.monotonic()
+
+    async def refresh_if_stale(self):
+        # Picks up activity changes made by other workers or by hand
+        if self._built_at is None or time.monotonic() - self._built_at > SCHEDULE_INDEX_TTL_SECONDS:
+            await self.rebuild()
+
+
+schedule_index = ScheduleIndex()
+
+
+async def enrolled_among(emails: Iterable[str], activities: Iterable[str]) -> Dict[str, Set[str]]:
+    """Map each of the students to the ones of `activities` they are enrolled in"""
+    taken: Dict[str, Set[str]] = defaultdict(set)
+    cursor = enrollments_collection.find(
+        {"email": {"$in": sorted(set(emails))}, "activity": {"$in": sorted(set(activities))}},
+        {"_id": 0, "activity": 1, "email": 1}
+    )
+    async for doc in cursor:
+        taken[doc["email"]].add(doc["activity"])
+    return taken
+
+
+async def find_schedule_conflict(activity: str, email: str) -> Optional[str]:
+    """Return an activity the student is enrolled in whose sessions overlap
+    `activity`'s, or None"""
+    await schedule_index.refresh_if_stale()
+    candidates = schedule_index.overlapping(activity)
+    if not candidates:
+        return None
+
+    enrollment = await enrollments_collection.find_one(
+        {"email": email, "activity": {"$in": sorted(candidates)}},
+        {"_id": 0, "activity": 1}
+    )
+    return enrollment["activity"] if enrollment else None
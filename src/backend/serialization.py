@@ -0,0 +1,96 @@
+"""
+JSON encoding for the list endpoints of the High School Management System API
+
+The list endpoints return pre-encoded Response objects instead of Python data,
+which skips FastAPI's response_model validation and jsonable_encoder pass.
+Documents are encoded with orjson; ObjectIds and dates fall back to str().
+Exports are streamed as NDJSON or CSV rows in the same chunked way.
+"""
+
+import csv
+import io
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+import orjson
+from fastapi import Response
+from fastapi.responses import StreamingResponse
+
+JSON_MEDIA_TYPE = "application/json"
+
+
+def dumps(payload: Any) -> bytes:
+    return orjson.dumps(payload, default=str)
+
+
+def json_response(body: bytes, headers: Optional[Dict[str, str]] = None) -> Response:
+    """Send an already encoded JSON body"""
+    return Response(content=body, media_type=JSON_MEDIA_TYPE, headers=headers)
+
+
+# Encoded documents are sent in chunks of about this many bytes
+STREAM_CHUNK_BYTES = 64 * 1024
+
+
+async def iter_json_object(cursor: AsyncIterator[Dict[str, Any]]) -> AsyncIterator[bytes]:
+    """Encode documents as one JSON object keyed by _id"""
+    parts = [b"{"]
+    size = 0
+    separator = b""
+    async for document in cursor:
+        key = document.pop("_id")
+        encoded = separator + dumps(str(key)) + b":" + dumps(document)
+        separator = b","
+        parts.append(encoded)
+        size += len(encoded)
+
+        if size >= STREAM_CHUNK_BYTES:
+            yield b"".join(parts)
+            parts, size = [], 0
+    parts.append(b"}")
+    yield b"".join(parts)
+
+
+def streaming_json_object(cursor: AsyncIterator[Dict[str, Any]]) -> StreamingResponse:
+    """Stream a cursor as a JSON object without holding the result in memory"""
+    return StreamingResponse(iter_json_object(cursor), media_type=JSON_MEDIA_TYPE)
+
+
+async def iter_ndjson(cursor: AsyncIterator[Dict[str, Any]]) -> AsyncIterator[bytes]:
+    """Encode documents as one JSON object per line"""
+    parts = []
+    size = 0
+    async for document in cursor:
+        encoded = orjson.dumps(document, default=str, option=orjson.OPT_APPEND_NEWLINE)
+        parts.append(encoded)
+        size += len(encoded)
+
+        if size >= STREAM_CHUNK_BYTES:
+            yield b"".join(parts)
+            parts, size = [], 0
+    if parts:
+        yield b"".join(parts)
+
+
+def csv_value(value: Any) -> Any:
+    # Lists such as schedule days share one cell; dates use ISO 8601
+    if isinstance(value, list):
+        return " ".join(str(item) for item in value)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+async def iter_csv(cursor: AsyncIterator[Dict[str, Any]], fields: List[str]) -> AsyncIterator[bytes]:
+    """Encode documents as CSV rows under a header row of `fields`"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(fields)
+    async for document in cursor:
+        writer.writerow([csv_value(document.get(field)) for field in fields])
+
+        if buffer.tell() >= STREAM_CHUNK_BYTES:
+            yield buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue().encode()
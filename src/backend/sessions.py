@@ -0,0 +1,159 @@
+"""
+Session tokens and teacher principal cache for the High School Management System API
+
+/auth/login issues an HMAC-signed token carrying the teacher's username and an
+expiry, so verifying a session needs no database access. The teacher record
+behind a token is kept in a small LRU/TTL cache; call invalidate_teacher()
+whenever a teacher document is changed.
+"""
+
+import base64
+import hashlib
+import hmac
+import os
+import secrets
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from fastapi import Header, HTTPException
+from pymongo import ReturnDocument
+
+from .database import settings_collection, teachers_collection
+
+SESSION_TTL_SECONDS = int(os.environ.get("SESSION_TTL_SECONDS", str(8 * 60 * 60)))
+
+# Signing key, loaded once at startup by load_session_secret()
+_secret: Optional[bytes] = None
+
+
+async def load_session_secret():
+    """Load the token signing key.
+
+    Uses SESSION_SECRET when set. Otherwise a random key is created once in the
+    settings collection so that every worker signs with the same key.
+    """
+    global _secret
+
+    if os.environ.get("SESSION_SECRET"):
+        _secret = os.environ["SESSION_SECRET"].encode()
+        return
+
+    setting = await settings_collection.find_one_and_update(
+        {"_id": "session_secret"},
+        {"$setOnInsert": {"value": secrets.token_hex(32)}},
+        upsert=True,
+        return_document=ReturnDocument.AFTER
+    )
+    _secret = setting["value"].encode()
+
+
+def _b64encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode()
+
+
+def _b64decode(data: str) -> bytes:
+    return base64.urlsafe_b64decode(data + "=" * (-len(data) % 4))
+
+
+def _sign(body: str) -> str:
+    if _secret is None:
+        raise RuntimeError("Session secret has not been loaded")
+    return _b64encode(hmac.new(_secret, body.encode(), hashlib.sha256).digest())
+
+
+def issue_token(username: str) -> str:
+    """Create a signed session token for a teacher"""
+    expires_at = int(time.time()) + SESSION_TTL_SECONDS
+    body = _b64encode(f"{expires_at}:{username}".encode())
+    return f"{body}.{_sign(body)}"
+
+
+def verify_token(token: str) -> Optional[str]:
+    """Return the username in a token, or None if it is forged, malformed or expired"""
+    try:
+        body, signature = token.split(".")
+        # Compare bytes: compare_digest rejects non-ASCII str with TypeError
+        if not hmac.compare_digest(signature.encode(), _sign(body).encode()):
+            return None
+        expires_at, username = _b64decode(body).decode().split(":", 1)
+        if int(expires_at) < time.time():
+            return None
+    except ValueError:
+        return None
+
+    return username
+
+
+class PrincipalCache:
+    """Bounded LRU cache of teacher records with a time-to-live"""
+
+    def __init__(self, max_entries: int = 1024, ttl: float = 60.0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+
+    def get(self, username: str) -> Optional[Dict[str, Any]]:
+        entry = self._entries.get(username)
+        if entry is None or time.monotonic() - entry[0] > self.ttl:
+            return None
+
+        self._entries.move_to_end(username)
+        return entry[1]
+
+    def put(self, username: str, principal: Dict[str, Any]):
+        self._entries[username] = (time.monotonic(), principal)
+        self._entries.move_to_end(username)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, username: str):
+        self._entries.pop(username, None)
+
+
+principal_cache = PrincipalCache(
+    max_entries=int(os.environ.get("PRINCIPAL_CACHE_MAX_ENTRIES", "1024")),
+    ttl=float(os.environ.get("PRINCIPAL_CACHE_TTL_SECONDS", "60"))
+)
+
+
+def to_principal(teacher: Dict[str, Any]) -> Dict[str, Any]:
+    """Public view of a teacher record (excluding password)"""
+    return {
+        "username": teacher["username"],
+        "display_name": teacher["display_name"],
+        "role": teacher["role"]
+    }
+
+
+def invalidate_teacher(username: str):
+    """Drop a teacher from the principal cache after their record changes"""
+    principal_cache.invalidate(username)
+
+
+async def get_principal(username: str) -> Optional[Dict[str, Any]]:
+    """Resolve a teacher, hitting the database only on a cache miss"""
+    principal = principal_cache.get(username)
+    if principal is None:
+        teacher = await teachers_collection.find_one({"_id": username})
+        if not teacher:
+            return None
+        principal = to_principal(teacher)
+        principal_cache.put(username, principal)
+
+    return principal
+
+
+async def require_teacher(authorization: Optional[str] = Header(None)) -> Dict[str, Any]:
+    """Dependency that resolves the teacher from an `Authorization: Bearer` token"""
+    if not authorization or not authorization.startswith("Bearer "):
+        raise HTTPException(
+            status_code=401, detail="Authentication required for this action")
+
+    username = verify_token(authorization[len("Bearer "):])
+    principal = await get_principal(username) if username else None
+    if not principal:
+        raise HTTPException(
+            status_code=401, detail="Invalid teacher credentials")
+
+    return principal
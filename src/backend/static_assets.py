@@ -0,0 +1,166 @@
+"""
+Static frontend assets for the High School Management System API
+
+At startup every file in the static directory is read once. Each asset other
+than index.html gets a content-hashed name (app.js becomes app.<hash>.js),
+and index.html is rewritten to reference those names. Compressible files are
+also gzip and brotli compressed once, so a request only picks the variant its
+Accept-Encoding allows and nothing is compressed per request.
+
+Hashed names never change content and are sent with an immutable, year-long
+Cache-Control. index.html and the original names must be revalidated, which
+is cheap thanks to their ETags.
+"""
+
+import gzip
+import hashlib
+import mimetypes
+import re
+from pathlib import Path
+from typing import Dict, Optional
+
+import brotli
+from fastapi import Response
+
+INDEX = "index.html"
+
+IMMUTABLE = "public, max-age=31536000, immutable"
+REVALIDATE = "no-cache"
+
+# Preferred first when the client accepts several
+ENCODINGS = ("br", "gzip")
+
+COMPRESSIBLE_TYPES = ("text/", "application/javascript", "application/json", "image/svg+xml")
+
+# Relative asset references in index.html, e.g. href="styles.css"
+ASSET_REFERENCE = re.compile(r'(src|href)="([^":/]+)"')
+
+
+class Asset:
+    """One file with its precompressed variants"""
+
+    def __init__(self, body: bytes, media_type: str, cache_control: str):
+        self.media_type = media_type
+        self.cache_control = cache_control
+        self.digest = hashlib.sha256(body).hexdigest()[:12]
+        self.variants: Dict[str, bytes] = {"identity": body}
+
+        if media_type.startswith(COMPRESSIBLE_TYPES):
+            for encoding, compressed in (("br", brotli.compress(body, quality=11)),
+                                         ("gzip", gzip.compress(body, 9, mtime=0))):
+                # Tiny files can grow when compressed
+                if len(compressed) < len(body):
+                    self.variants[encoding] = compressed
+
+    def choose_encoding(self, accept_encoding: str) -> str:
+        accepted = parse_accept_encoding(accept_encoding)
+        for encoding in ENCODINGS:
+            if encoding in self.variants and accepted.get(encoding, accepted.get("*", 0)) > 0:
+                return encoding
+        return "identity"
+
+
+def parse_accept_encoding(header: str) -> Dict[str, float]:
+    """Map each coding in an Accept-Encoding header to its q value"""
+    accepted = {}
+    for item in header.split(","):
+        coding, _, params = item.strip().partition(";")
+        if not coding:
+            continue
+        quality = 1.0
+        name, _, value = params.strip().partition("=")
+        if name.strip() == "q":
+            try:
+                quality = float(value)
+            except ValueError:
+                quality = 0.0
+        accepted[coding.strip().lower()] = quality
+    return accepted
+
+
+def media_type_for(name: str) -> str:
+    media_type = mimetypes.guess_type(name)[0] or "application/octet-stream"
+    if media_type.startswith("text/") or media_type == "application/javascript":
+        media_type += "; charset=utf-8"
+    return media_type
+
+
+def hashed_name(path: Path, digest: str) -> str:
+    return f"{path.stem}.{digest}{path.suffix}"
+
+
+class StaticAssets:
+    """ASGI app serving the static directory from memory"""
+
+    def __init__(self, directory: Path):
+        self.directory = directory
+        self.assets: Dict[str, Asset] = {}
+        # Original name -> content-hashed name
+        self.hashed_names: Dict[str, str] = {}
+
+    def build(self):
+        """Read, fingerprint and compress every asset, and rewrite index.html"""
+        assets, hashed_names = {}, {}
+        for path in sorted(self.directory.iterdir()):
+            if not path.is_file() or path.name == INDEX:
+                continue
+            body = path.read_bytes()
+            media_type = media_type_for(path.name)
+            asset = Asset(body, media_type, IMMUTABLE)
+            hashed_names[path.name] = hashed_name(path, asset.digest)
+            assets[hashed_names[path.name]] = asset
+            # Keep the original name working for anything that still uses it
+            assets[path.name] = Asset(body, media_type, REVALIDATE)
+
+        def fingerprint(match: re.Match) -> str:
+            name = hashed_names.get(match.group(2), match.group(2))
+            return f'{match.group(1)}="{name}"'
+
+        index = (self.directory / INDEX).read_text(encoding="utf-8")
+        index = ASSET_REFERENCE.sub(fingerprint, index)
+        assets[INDEX] = Asset(index.encode("utf-8"), media_type_for(INDEX), REVALIDATE)
+
+        self.assets, self.hashed_names = assets, hashed_names
+
+    def response_for(self, name: str, method: str, headers: Dict[str, str]) -> Response:
+        if method not in ("GET", "HEAD"):
+            return Response("Method Not Allowed", status_code=405, headers={"Allow": "GET, HEAD"})
+
+        asset: Optional[Asset] = self.assets.get(name)
+        if asset is None:
+            return Response("Not Found", status_code=404)
+
+        encoding = asset.choose_encoding(headers.get("accept-encoding", ""))
+        etag = f'"{asset.digest}-{encoding}"'
+        response_headers = {"Cache-Control": asset.cache_control, "ETag": etag}
+        if len(asset.variants) > 1:
+            response_headers["Vary"] = "Accept-Encoding"
+
+        if etag in headers.get("if-none-match", ""):
+            return Response(status_code=304, headers=response_headers)
+
+        body = asset.variants[encoding]
+        if encoding != "identity":
+            response_headers["Content-Encoding"] = encoding
+        if method == "HEAD":
+            response_headers["Content-Length"] = str(len(body))
+            body = b""
+        return Response(body, media_type=asset.media_type, headers=response_headers)
+
+    async def __call__(self, scope, receive, send):
+        if not self.assets:
+            self.build()
+
+        # Under a mount the path still starts with the mount's root_path
+        path = scope["path"]
+        root_path = scope.get("root_path", "")
+        if root_path and path.startswith(root_path):
+            path = path[len(root_path):]
+
+        headers = {name.decode("latin-1").lower(): value.decode("latin-1")
+                   for name, value in scope["headers"]}
+        response = self.response_for(path.lstrip("/"), scope["method"], headers)
+        await response(scope, receive, send)
+
+
+static_assets = StaticAssets(Path(__file__).parent.parent / "static")
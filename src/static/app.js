@@ -60,6 +60,12 @@ document.addEventListener("DOMContentLoaded", () => {
   // Authentication state
   let currentUser = null;
 
+  // Announcements shown in the management modal
+  let allAnnouncements = [];
+
+  // Server-Sent Events connection for live updates
+  let eventSource = null;
+
   // Time range mappings for the dropdown
   const timeRanges = {
     morning: { start: "06:00", end: "08:00" }, // Before school hours
@@ -121,8 +127,8 @@ document.addEventListener("DOMContentLoaded", () => {
       try {
         currentUser = JSON.parse(savedUser);
         updateAuthUI();
-        // Verify the stored user with the server
-        validateUserSession(currentUser.username);
+        // Verify the stored session token with the server
+        validateUserSession();
       } catch (error) {
         console.error("Error parsing saved user", error);
         logout(); // Clear invalid data
@@ -133,12 +139,17 @@ document.addEventListener("DOMContentLoaded", () => {
     updateAuthBodyClass();
   }
 
+  // Build request headers carrying the session token
+  function authHeaders() {
+    return currentUser ? { Authorization: `Bearer ${currentUser.token}` } : {};
+  }
+
   // Validate user session with the server
-  async function validateUserSession(username) {
+  async function validateUserSession() {
     try {
-      const response = await fetch(
-        `/auth/check-session?username=${encodeURIComponent(username)}`
-      );
+      const response = await fetch("/auth/check-session", {
+        headers: authHeaders(),
+      });
 
       if (!response.ok) {
         // Session invalid, log out
@@ -146,10 +157,10 @@ document.addEventListener("DOMContentLoaded", () => {
         return;
       }
 
-      // Session is valid, update user data
+      // Session is valid, update user data and keep the token
       const userData = await response.json();
-      currentUser = userData;
-      localStorage.setItem("currentUser", JSON.stringify(userData));
+      currentUser = { ...userData, token: currentUser.token };
+      localStorage.setItem("currentUser", JSON.stringify(currentUser));
       updateAuthUI();
     } catch (error) {
       console.error("Error validating session:", error);
@@ -313,66 +324,32 @@ document.addEventListener("DOMContentLoaded", () => {
     return details.schedule;
   }
 
-  // Function to determine activity type (this would ideally come from backend)
-  function getActivityType(activityName, description) {
-    const name = activityName.toLowerCase();
-    const desc = description.toLowerCase();
-
-    if (
-      name.includes("soccer") ||
-      name.includes("basketball") ||
-      name.includes("sport") ||
-      name.includes("fitness") ||
-      desc.includes("team") ||
-      desc.includes("game") ||
-      desc.includes("athletic")
-    ) {
-      return "sports";
-    } else if (
-      name.includes("art") ||
-      name.includes("music") ||
-      name.includes("theater") ||
-      name.includes("drama") ||
-      desc.includes("creative") ||
-      desc.includes("paint")
-    ) {
-      return "arts";
-    } else if (
-      name.includes("science") ||
-      name.includes("math") ||
-      name.includes("academic") ||
-      name.includes("study") ||
-      name.includes("olympiad") ||
-      desc.includes("learning") ||
-      desc.includes("education") ||
-      desc.includes("competition")
-    ) {
-      return "academic";
-    } else if (
-      name.includes("volunteer") ||
-      name.includes("community") ||
-      desc.includes("service") ||
-      desc.includes("volunteer")
-    ) {
-      return "community";
-    } else if (
-      name.includes("computer") ||
-      name.includes("coding") ||
-      name.includes("tech") ||
-      name.includes("robotics") ||
-      desc.includes("programming") ||
-      desc.includes("technology") ||
-      desc.includes("digital") ||
-      desc.includes("robot")
-    ) {
-      return "technology";
-    }
+  // Show how many activities meet on each day on the day filter buttons
+  async function fetchDaySummary() {
+    try {
+      const response = await fetch("/activities/days/summary");
+      const summary = await response.json();
 
-    // Default to "academic" if no match
-    return "academic";
+      const counts = { "": summary.total };
+      summary.days.forEach((entry) => {
+        counts[entry.day] = entry.activity_count;
+      });
+
+      dayFilters.forEach((button) => {
+        let badge = button.querySelector(".day-count");
+        if (!badge) {
+          badge = document.createElement("span");
+          badge.className = "day-count";
+          button.appendChild(badge);
+        }
+        badge.textContent = counts[button.dataset.day] || 0;
+      });
+    } catch (error) {
+      console.error("Error fetching day summary:", error);
+    }
   }
 
-  // Function to fetch activities from API with optional day and time filters
+  // Function to fetch activities from API with the current search and filters
   async function fetchActivities() {
     // Show loading skeletons first
     showLoadingSkeletons();
@@ -401,8 +378,20 @@ document.addEventListener("DOMContentLoaded", () => {
         }
       }
 
-      const queryString =
-        queryParams.length > 0 ? `?${queryParams.join("&")}` : "";
+      // Search and category filtering are done by the server
+      if (searchQuery.trim()) {
+        queryParams.push(`q=${encodeURIComponent(searchQuery.trim())}`);
+      }
+
+      if (currentFilter !== "all") {
+        queryParams.push(`category=${encodeURIComponent(currentFilter)}`);
+      }
+
+      // Only participant counts are needed for the cards; rosters are
+      // loaded on demand when a card's participant list is opened
+      queryParams.push("summary=true");
+
+      const queryString = `?${queryParams.join("&")}`;
       const response = await fetch(`/activities${queryString}`);
       const activities = await response.json();
 
@@ -423,17 +412,10 @@ document.addEventListener("DOMContentLoaded", () => {
     // Clear the activities list
     activitiesList.innerHTML = "";
 
-    // Apply client-side filtering - this handles category filter and search, plus weekend filter
+    // Apply client-side filtering - only the weekend filter is left to the client
     let filteredActivities = {};
 
     Object.entries(allActivities).forEach(([name, details]) => {
-      const activityType = getActivityType(name, details.description);
-
-      // Apply category filter
-      if (currentFilter !== "all" && activityType !== currentFilter) {
-        return;
-      }
-
       // Apply weekend filter if selected
       if (currentTimeRange === "weekend" && details.schedule_details) {
         const activityDays = details.schedule_details.days;
@@ -446,20 +428,6 @@ document.addEventListener("DOMContentLoaded", () => {
         }
       }
 
-      // Apply search filter
-      const searchableContent = [
-        name.toLowerCase(),
-        details.description.toLowerCase(),
-        formatSchedule(details).toLowerCase(),
-      ].join(" ");
-
-      if (
-        searchQuery &&
-        !searchableContent.includes(searchQuery.toLowerCase())
-      ) {
-        return;
-      }
-
       // Activity passed all filters, add to filtered list
       filteredActivities[name] = details;
     });
@@ -483,13 +451,19 @@ document.addEventListener("DOMContentLoaded", () => {
 
   // Function to render a single activity card
   function renderActivityCard(name, details) {
+    activitiesList.appendChild(createActivityCard(name, details));
+  }
+
+  // Function to build the element for a single activity card
+  function createActivityCard(name, details) {
     const activityCard = document.createElement("div");
     activityCard.className = "activity-card";
+    activityCard.dataset.activity = name;
 
     // Calculate spots and capacity
     const totalSpots = details.max_participants;
-    const takenSpots = details.participants.length;
-    const spotsLeft = totalSpots - takenSpots;
+    const takenSpots = details.participant_count;
+    const spotsLeft = details.spots_left;
     const capacityPercentage = (takenSpots / totalSpots) * 100;
     const isFull = spotsLeft <= 0;
 
@@ -501,9 +475,8 @@ document.addEventListener("DOMContentLoaded", () => {
       capacityStatusClass = "capacity-near-full";
     }
 
-    // Determine activity type
-    const activityType = getActivityType(name, details.description);
-    const typeInfo = activityTypes[activityType];
+    // Activity type is classified by the server
+    const typeInfo = activityTypes[details.category] || activityTypes.academic;
 
     // Format the schedule using the new helper function
     const formattedSchedule = formatSchedule(details);
@@ -537,30 +510,11 @@ document.addEventListener("DOMContentLoaded", () => {
         <span class="tooltip-text">Regular meetings at this time throughout the semester</span>
       </p>
       ${capacityIndicator}
-      <div class="participants-list">
-        <h5>Current Participants:</h5>
-        <ul>
-          ${details.participants
-            .map(
-              (email) => `
-            <li>
-              ${email}
-              ${
-                currentUser
-                  ? `
-                <span class="delete-participant tooltip" data-activity="${name}" data-email="${email}">
-                  ✖
-                  <span class="tooltip-text">Unregister this student</span>
-                </span>
-              `
-                  : ""
-              }
-            </li>
-          `
-            )
-            .join("")}
-        </ul>
-      </div>
+      <details class="participants-list">
+        <summary>Current Participants (${takenSpots})</summary>
+        <ul></ul>
+        <button type="button" class="load-more-participants hidden">Load more</button>
+      </details>
       <div class="activity-card-actions">
         ${
           currentUser
@@ -580,10 +534,20 @@ document.addEventListener("DOMContentLoaded", () => {
       </div>
     `;
 
-    // Add click handlers for delete buttons
-    const deleteButtons = activityCard.querySelectorAll(".delete-participant");
-    deleteButtons.forEach((button) => {
-      button.addEventListener("click", handleUnregister);
+    // Load the roster the first time the participant list is opened
+    const participantsList = activityCard.querySelector(".participants-list");
+    const participantsItems = participantsList.querySelector("ul");
+    const loadMoreButton = participantsList.querySelector(
+      ".load-more-participants"
+    );
+    participantsList.addEventListener("toggle", () => {
+      if (participantsList.open && !participantsList.dataset.loaded) {
+        participantsList.dataset.loaded = "true";
+        loadParticipants(name, participantsItems, loadMoreButton);
+      }
+    });
+    loadMoreButton.addEventListener("click", () => {
+      loadParticipants(name, participantsItems, loadMoreButton);
     });
 
     // Add click handler for register button (only when authenticated)
@@ -596,19 +560,127 @@ document.addEventListener("DOMContentLoaded", () => {
       }
     }
 
-    activitiesList.appendChild(activityCard);
+    return activityCard;
+  }
+
+  // Apply a participant count change pushed by the server to a displayed card
+  function applyActivityDelta(delta) {
+    const details = allActivities[delta.name];
+    if (!details) {
+      return;
+    }
+
+    details.participant_count = delta.participant_count;
+    details.spots_left = delta.spots_left;
+
+    const card = Array.from(activitiesList.children).find(
+      (element) => element.dataset.activity === delta.name
+    );
+    if (card) {
+      card.replaceWith(createActivityCard(delta.name, details));
+    }
+  }
+
+  // Function to create a participant list item
+  function createParticipantItem(name, email) {
+    const item = document.createElement("li");
+    item.innerHTML = `
+      ${email}
+      ${
+        currentUser
+          ? `
+        <span class="delete-participant tooltip" data-activity="${name}" data-email="${email}">
+          ✖
+          <span class="tooltip-text">Unregister this student</span>
+        </span>
+      `
+          : ""
+      }
+    `;
+
+    const deleteButton = item.querySelector(".delete-participant");
+    if (deleteButton) {
+      deleteButton.addEventListener("click", handleUnregister);
+    }
+
+    return item;
+  }
+
+  // Function to fetch the next page of an activity's participants
+  async function loadParticipants(name, list, loadMoreButton) {
+    const params = new URLSearchParams({ limit: 50 });
+    if (list.dataset.nextCursor) {
+      params.append("cursor", list.dataset.nextCursor);
+    }
+
+    try {
+      const response = await fetch(
+        `/activities/${encodeURIComponent(name)}/participants?${params}`
+      );
+      const page = await response.json();
+
+      if (!response.ok) {
+        showMessage(page.detail || "Failed to load participants", "error");
+        return;
+      }
+
+      page.participants.forEach((email) => {
+        list.appendChild(createParticipantItem(name, email));
+      });
+
+      // Show the "Load more" button only while more pages remain
+      if (page.next_cursor) {
+        list.dataset.nextCursor = page.next_cursor;
+        loadMoreButton.classList.remove("hidden");
+      } else {
+        delete list.dataset.nextCursor;
+        loadMoreButton.classList.add("hidden");
+      }
+    } catch (error) {
+      showMessage("Failed to load participants. Please try again.", "error");
+      console.error("Error fetching participants:", error);
+    }
   }
 
   // Event listeners for search and filter
+  let searchDebounceTimer = null;
+
+  // The server matches whole words, except that a single term of up to four
+  // characters matches the start of a word in an activity name. Search as you
+  // type while one of those applies; a longer word still being typed would
+  // match nothing, so it waits for a space, Enter or the search button.
+  function canSearchWhileTyping(value) {
+    const term = value.trim();
+    return term === "" || /\s$/.test(value) || (term.length <= 4 && !/\s/.test(term));
+  }
+
+  function submitSearch() {
+    clearTimeout(searchDebounceTimer);
+    searchQuery = searchInput.value;
+    fetchActivities();
+  }
+
   searchInput.addEventListener("input", (event) => {
+    clearTimeout(searchDebounceTimer);
+    if (!canSearchWhileTyping(event.target.value)) {
+      return;
+    }
+
+    // Wait for a pause in typing before querying the server
     searchQuery = event.target.value;
-    displayFilteredActivities();
+    searchDebounceTimer = setTimeout(fetchActivities, 300);
+  });
+
+  searchInput.addEventListener("keydown", (event) => {
+    if (event.key === "Enter") {
+      event.preventDefault();
+      submitSearch();
+    }
   });
 
   searchButton.addEventListener("click", (event) => {
     event.preventDefault();
-    searchQuery = searchInput.value;
-    displayFilteredActivities();
+    submitSearch();
   });
 
   // Add event listeners to category filter buttons
@@ -618,9 +690,9 @@ document.addEventListener("DOMContentLoaded", () => {
       categoryFilters.forEach((btn) => btn.classList.remove("active"));
       button.classList.add("active");
 
-      // Update current filter and display filtered activities
+      // Update current filter and fetch matching activities
       currentFilter = button.dataset.category;
-      displayFilteredActivities();
+      fetchActivities();
     });
   });
 
@@ -776,11 +848,10 @@ document.addEventListener("DOMContentLoaded", () => {
           const response = await fetch(
             `/activities/${encodeURIComponent(
               activity
-            )}/unregister?email=${encodeURIComponent(
-              email
-            )}&teacher_username=${encodeURIComponent(currentUser.username)}`,
+            )}/unregister?email=${encodeURIComponent(email)}`,
             {
               method: "POST",
+              headers: authHeaders(),
             }
           );
 
@@ -788,8 +859,10 @@ document.addEventListener("DOMContentLoaded", () => {
 
           if (response.ok) {
             showMessage(result.message, "success");
-            // Refresh the activities list
-            fetchActivities();
+            // The change event updates the card; reload only without one
+            if (!isEventStreamOpen()) {
+              fetchActivities();
+            }
           } else {
             showMessage(result.detail || "An error occurred", "error");
           }
@@ -833,11 +906,10 @@ document.addEventListener("DOMContentLoaded", () => {
       const response = await fetch(
         `/activities/${encodeURIComponent(
           activity
-        )}/signup?email=${encodeURIComponent(
-          email
-        )}&teacher_username=${encodeURIComponent(currentUser.username)}`,
+        )}/signup?email=${encodeURIComponent(email)}`,
         {
           method: "POST",
+          headers: authHeaders(),
         }
       );
 
@@ -846,8 +918,10 @@ document.addEventListener("DOMContentLoaded", () => {
       if (response.ok) {
         showMessage(result.message, "success");
         closeRegistrationModalHandler();
-        // Refresh the activities list after successful signup
-        fetchActivities();
+        // The change event updates the card; reload only without one
+        if (!isEventStreamOpen()) {
+          fetchActivities();
+        }
       } else {
         showMessage(result.detail || "An error occurred", "error");
       }
@@ -888,73 +962,78 @@ document.addEventListener("DOMContentLoaded", () => {
   async function fetchAllAnnouncements() {
     try {
       const response = await fetch("/announcements?active_only=false");
-      const announcements = await response.json();
+      allAnnouncements = await response.json();
+      renderAnnouncementsList();
+    } catch (error) {
+      console.error("Error fetching announcements:", error);
+      showAnnouncementMessage("Failed to load announcements", "error");
+    }
+  }
 
-      announcementsItems.innerHTML = "";
+  // Display the announcements held in allAnnouncements
+  function renderAnnouncementsList() {
+    const announcements = allAnnouncements;
+    announcementsItems.innerHTML = "";
 
-      if (announcements.length === 0) {
-        announcementsItems.innerHTML = `
-          <div style="text-align: center; color: var(--text-secondary); padding: 20px;">
-            No announcements yet. Create one below!
-          </div>
-        `;
-        return;
-      }
+    if (announcements.length === 0) {
+      announcementsItems.innerHTML = `
+        <div style="text-align: center; color: var(--text-secondary); padding: 20px;">
+          No announcements yet. Create one below!
+        </div>
+      `;
+      return;
+    }
 
-      const currentDate = new Date().toISOString().split("T")[0]; // Use UTC date for consistency with server
+    const currentDate = new Date().toISOString().split("T")[0]; // Use UTC date for consistency with server
 
-      announcements.forEach((announcement) => {
-        const isActive =
-          (!announcement.start_date || announcement.start_date <= currentDate) &&
-          announcement.expiration_date >= currentDate;
+    announcements.forEach((announcement) => {
+      const isActive =
+        (!announcement.start_date || announcement.start_date <= currentDate) &&
+        announcement.expiration_date >= currentDate;
 
-        const announcementItem = document.createElement("div");
-        announcementItem.className = `announcement-item ${isActive ? "" : "inactive"}`;
+      const announcementItem = document.createElement("div");
+      announcementItem.className = `announcement-item ${isActive ? "" : "inactive"}`;
 
-        const startDateText = announcement.start_date
-          ? `Start: ${formatDate(announcement.start_date)}`
-          : "Immediate";
-        const expirationDateText = `Expires: ${formatDate(announcement.expiration_date)}`;
-        const statusText = isActive ? "(Active)" : "(Inactive)";
+      const startDateText = announcement.start_date
+        ? `Start: ${formatDate(announcement.start_date)}`
+        : "Immediate";
+      const expirationDateText = `Expires: ${formatDate(announcement.expiration_date)}`;
+      const statusText = isActive ? "(Active)" : "(Inactive)";
 
-        announcementItem.innerHTML = `
-          <div class="announcement-item-message">${announcement.message}</div>
-          <div class="announcement-item-dates">
-            ${startDateText} | ${expirationDateText} ${statusText}
-          </div>
-          <div class="announcement-item-actions">
-            <button class="edit-announcement-btn" data-id="${announcement.id}">Edit</button>
-            <button class="delete-announcement-btn" data-id="${announcement.id}">Delete</button>
-          </div>
-        `;
+      announcementItem.innerHTML = `
+        <div class="announcement-item-message">${announcement.message}</div>
+        <div class="announcement-item-dates">
+          ${startDateText} | ${expirationDateText} ${statusText}
+        </div>
+        <div class="announcement-item-actions">
+          <button class="edit-announcement-btn" data-id="${announcement.id}">Edit</button>
+          <button class="delete-announcement-btn" data-id="${announcement.id}">Delete</button>
+        </div>
+      `;
 
-        announcementsItems.appendChild(announcementItem);
-      });
+      announcementsItems.appendChild(announcementItem);
+    });
 
-      // Add event listeners to edit and delete buttons
-      document.querySelectorAll(".edit-announcement-btn").forEach((btn) => {
-        btn.addEventListener("click", (e) => {
-          const announcementId = e.target.dataset.id;
-          const announcement = announcements.find((a) => a.id === announcementId);
-          if (announcement) {
-            startEditAnnouncement(announcement);
-          }
-        });
+    // Add event listeners to edit and delete buttons
+    document.querySelectorAll(".edit-announcement-btn").forEach((btn) => {
+      btn.addEventListener("click", (e) => {
+        const announcementId = e.target.dataset.id;
+        const announcement = announcements.find((a) => a.id === announcementId);
+        if (announcement) {
+          startEditAnnouncement(announcement);
+        }
       });
+    });
 
-      document.querySelectorAll(".delete-announcement-btn").forEach((btn) => {
-        btn.addEventListener("click", (e) => {
-          const announcementId = e.target.dataset.id;
-          const announcement = announcements.find((a) => a.id === announcementId);
-          if (announcement) {
-            deleteAnnouncement(announcementId, announcement.message);
-          }
-        });
+    document.querySelectorAll(".delete-announcement-btn").forEach((btn) => {
+      btn.addEventListener("click", (e) => {
+        const announcementId = e.target.dataset.id;
+        const announcement = announcements.find((a) => a.id === announcementId);
+        if (announcement) {
+          deleteAnnouncement(announcementId, announcement.message);
+        }
       });
-    } catch (error) {
-      console.error("Error fetching announcements:", error);
-      showAnnouncementMessage("Failed to load announcements", "error");
-    }
+    });
   }
 
   // Format date for display
@@ -1033,7 +1112,6 @@ document.addEventListener("DOMContentLoaded", () => {
     const params = new URLSearchParams({
       message,
       expiration_date: expirationDate,
-      teacher_username: currentUser.username,
     });
 
     if (startDate) {
@@ -1046,11 +1124,13 @@ document.addEventListener("DOMContentLoaded", () => {
         // Update existing announcement
         response = await fetch(`/announcements/${announcementId}?${params}`, {
           method: "PUT",
+          headers: authHeaders(),
         });
       } else {
         // Create new announcement
         response = await fetch(`/announcements?${params}`, {
           method: "POST",
+          headers: authHeaders(),
         });
       }
 
@@ -1062,8 +1142,11 @@ document.addEventListener("DOMContentLoaded", () => {
           "success"
         );
         resetAnnouncementForm();
-        fetchAllAnnouncements();
-        fetchActiveAnnouncements(); // Update banner
+        // The change event updates the list and banner; reload only without one
+        if (!isEventStreamOpen()) {
+          fetchAllAnnouncements();
+          fetchActiveAnnouncements(); // Update banner
+        }
       } else {
         showAnnouncementMessage(result.detail || "Failed to save announcement", "error");
       }
@@ -1084,21 +1167,20 @@ document.addEventListener("DOMContentLoaded", () => {
         }
 
         try {
-          const response = await fetch(
-            `/announcements/${announcementId}?teacher_username=${encodeURIComponent(
-              currentUser.username
-            )}`,
-            {
-              method: "DELETE",
-            }
-          );
+          const response = await fetch(`/announcements/${announcementId}`, {
+            method: "DELETE",
+            headers: authHeaders(),
+          });
 
           const result = await response.json();
 
           if (response.ok) {
             showAnnouncementMessage("Announcement deleted!", "success");
-            fetchAllAnnouncements();
-            fetchActiveAnnouncements(); // Update banner
+            // The change event updates the list and banner; reload only without one
+            if (!isEventStreamOpen()) {
+              fetchAllAnnouncements();
+              fetchActiveAnnouncements(); // Update banner
+            }
           } else {
             showAnnouncementMessage(
               result.detail || "Failed to delete announcement",
@@ -1141,8 +1223,65 @@ document.addEventListener("DOMContentLoaded", () => {
     announcementForm.addEventListener("submit", handleAnnouncementFormSubmit);
   }
 
+  // Apply an announcement change pushed by the server
+  function applyAnnouncementDelta(delta) {
+    const announcement = delta.announcement;
+
+    if (delta.action === "deleted") {
+      allAnnouncements = allAnnouncements.filter((a) => a.id !== announcement.id);
+    } else if (delta.action === "updated") {
+      allAnnouncements = allAnnouncements.map((a) =>
+        a.id === announcement.id ? announcement : a
+      );
+    } else {
+      allAnnouncements.push(announcement);
+    }
+
+    // Only redraw the list while the management modal is open
+    if (!announcementsModal.classList.contains("hidden")) {
+      renderAnnouncementsList();
+    }
+    fetchActiveAnnouncements(); // Update banner
+  }
+
   // ===== END ANNOUNCEMENTS FUNCTIONALITY =====
 
+  // ===== LIVE UPDATES =====
+
+  // Check whether change events are currently being received
+  function isEventStreamOpen() {
+    return eventSource !== null && eventSource.readyState === EventSource.OPEN;
+  }
+
+  // Subscribe to activity and announcement changes from the server
+  function connectEventStream() {
+    if (!window.EventSource) {
+      return;
+    }
+
+    eventSource = new EventSource("/events");
+    let hasConnected = false;
+
+    eventSource.addEventListener("open", () => {
+      // Changes may have been missed while disconnected, so resync once
+      if (hasConnected) {
+        fetchActivities();
+        fetchActiveAnnouncements();
+      }
+      hasConnected = true;
+    });
+
+    eventSource.addEventListener("activity", (event) => {
+      applyActivityDelta(JSON.parse(event.data));
+    });
+
+    eventSource.addEventListener("announcement", (event) => {
+      applyAnnouncementDelta(JSON.parse(event.data));
+    });
+  }
+
+  // ===== END LIVE UPDATES =====
+
   // Global click handler for closing modals when clicking outside
   window.addEventListener("click", (event) => {
     if (event.target === loginModal) {
@@ -1160,5 +1299,7 @@ document.addEventListener("DOMContentLoaded", () => {
   checkAuthentication();
   initializeFilters();
   fetchActivities();
+  fetchDaySummary();
   fetchActiveAnnouncements();
+  connectEventStream();
 });
@@ -0,0 +1,150 @@
+"""
+Shared fixtures for the tests that run against a real MongoDB
+
+A disposable mongod is started as a single-node replica set in a temporary
+directory, so read preferences and majority write concerns take the real
+replica-set code paths. Set MONGOD to the binary to use; otherwise mongod is
+looked up on PATH. Without one, every test that needs it is skipped.
+
+The app reads its MongoDB settings when it is imported, so src.app is only
+imported once the server is up. All tests share one event loop, the one the
+app's async Mongo client is bound to, and run inside the app's lifespan.
+"""
+
+import asyncio
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import httpx
+import pytest
+from pymongo import MongoClient, monitoring
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT))
+
+REPLICA_SET = "test-rs"
+TEST_DATABASE = "mergington_test"
+
+
+class CommandLog(monitoring.CommandListener):
+    """Every command the app's client sends, as (name, command) pairs"""
+
+    def __init__(self):
+        self.commands = []
+
+    def started(self, event):
+        self.commands.append((event.command_name, dict(event.command)))
+
+    def succeeded(self, event):
+        pass
+
+    def failed(self, event):
+        pass
+
+
+command_log = CommandLog()
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@pytest.fixture(scope="session")
+def mongo_uri(tmp_path_factory):
+    """URI of a single-node replica set that lives for the whole session"""
+    mongod = os.environ.get("MONGOD") or shutil.which("mongod")
+    if not mongod:
+        pytest.skip("mongod is not available; set MONGOD or put it on PATH")
+
+    port = free_port()
+    process = subprocess.Popen(
+        [mongod, "--dbpath", str(tmp_path_factory.mktemp("mongod")), "--port", str(port),
+         "--bind_ip", "127.0.0.1", "--replSet", REPLICA_SET, "--quiet"],
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+    try:
+        client = MongoClient(f"mongodb://127.0.0.1:{port}/", directConnection=True,
+                             serverSelectionTimeoutMS=20000)
+        client.admin.command("replSetInitiate", {
+            "_id": REPLICA_SET,
+            "members": [{"_id": 0, "host": f"127.0.0.1:{port}"}]
+        })
+        deadline = time.monotonic() + 30
+        while not client.admin.command("hello").get("isWritablePrimary"):
+            if time.monotonic() > deadline:
+                pytest.fail("The replica set did not elect a primary within 30 seconds")
+            time.sleep(0.2)
+        client.close()
+
+        yield f"mongodb://127.0.0.1:{port}/?replicaSet={REPLICA_SET}"
+    finally:
+        process.terminate()
+        process.wait()
+
+
+@pytest.fixture(scope="session")
+def run():
+    """Run a coroutine to completion on the session's event loop"""
+    loop = asyncio.new_event_loop()
+    yield loop.run_until_complete
+    loop.close()
+
+
+@pytest.fixture(scope="session")
+def app(mongo_uri, run):
+    """The application, started against a fresh test database"""
+    os.environ.update({
+        "MONGODB_URI": mongo_uri,
+        "MONGODB_DATABASE": TEST_DATABASE,
+        "MONGODB_WRITE_CONCERN": "majority",
+        "SESSION_SECRET": "test-secret"
+    })
+    MongoClient(mongo_uri).drop_database(TEST_DATABASE)
+
+    # Registered globally before the app's client is created so it sees
+    # every command
+    monitoring.register(command_log)
+    from src.app import app
+
+    lifespan = app.router.lifespan_context(app)
+    run(lifespan.__aenter__())
+    yield app
+    run(lifespan.__aexit__(None, None, None))
+
+
+@pytest.fixture
+def mongo_commands(app):
+    """The commands the app sends during the test"""
+    command_log.commands.clear()
+    return command_log.commands
+
+
+@pytest.fixture
+def sync_db(app, mongo_uri):
+    """A blocking handle on the test database, for setup and explain()"""
+    client = MongoClient(mongo_uri)
+    yield client[TEST_DATABASE]
+    client.close()
+
+
+@pytest.fixture
+def client(app, run):
+    """An HTTP client that calls the app in-process"""
+    http = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test")
+    yield http
+    run(http.aclose())
+
+
+@pytest.fixture
+def teacher_headers(client, run):
+    response = run(client.post(
+        "/auth/login", params={"username": "mrodriguez", "password": "art123"}))
+    assert response.status_code == 200
+    return {"Authorization": f"Bearer {response.json()['token']}"}
@@ -0,0 +1,46 @@
+"""
+Announcement dates sent with a time must not break the active snapshot
+"""
+
+import pytest
+
+
+@pytest.fixture
+def cleanup(sync_db):
+    created = []
+    yield created
+    sync_db.announcements.delete_many({"_id": {"$in": created}})
+
+
+def test_dates_with_a_time_are_stored_as_plain_dates(client, run, teacher_headers,
+                                                     sync_db, cleanup):
+    from bson import ObjectId
+
+    response = run(client.post("/announcements", params={
+        "message": "Timed announcement",
+        "start_date": "2000-01-01T08:30",
+        "expiration_date": "2099-12-31T10:00"
+    }, headers=teacher_headers))
+    assert response.status_code == 200
+    announcement_id = ObjectId(response.json()["id"])
+    cleanup.append(announcement_id)
+
+    stored = sync_db.announcements.find_one({"_id": announcement_id})
+    assert stored["start_date"] == "2000-01-01"
+    assert stored["expiration_date"] == "2099-12-31"
+
+
+def test_active_snapshot_reads_legacy_dates_with_a_time(client, run, sync_db, cleanup):
+    from src.backend.announcement_snapshot import active_announcements
+
+    # Written before the handlers normalized dates
+    result = sync_db.announcements.insert_one({
+        "message": "Legacy timed announcement",
+        "expiration_date": "2099-12-31T10:00"
+    })
+    cleanup.append(result.inserted_id)
+    active_announcements.invalidate()
+
+    response = run(client.get("/announcements", params={"active_only": "true"}))
+    assert response.status_code == 200
+    assert str(result.inserted_id) in {item["id"] for item in response.json()}
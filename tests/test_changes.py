@@ -0,0 +1,35 @@
+"""
+GET /changes never skips a change that may still be in flight
+"""
+
+
+def test_fresh_changes_are_sent_again(client, run, teacher_headers):
+    response = run(client.post("/activities/Chess Club/signup", params={
+        "email": "changes-test@mergington.edu"}, headers=teacher_headers))
+    assert response.status_code == 200
+
+    first = run(client.get("/changes", params={"since": 0})).json()
+    assert "Chess Club" in first["activities"]
+
+    # The signup is younger than the settle window, so next_since stays
+    # before it and the next poll returns it again
+    second = run(client.get("/changes", params={"since": first["next_since"]})).json()
+    assert "Chess Club" in second["activities"]
+
+    response = run(client.post("/activities/Chess Club/unregister", params={
+        "email": "changes-test@mergington.edu"}, headers=teacher_headers))
+    assert response.status_code == 200
+
+
+def test_stale_since_resets_the_client(client, run):
+    response = run(client.get("/changes", params={"since": 1}))
+    assert response.status_code == 200
+    assert response.json()["reset"] is True
+    assert response.json()["since"] == 0
+
+
+def test_tombstones_expire(sync_db):
+    from src.backend.database import DELETIONS_RETENTION_SECONDS
+
+    indexes = sync_db.deletions.index_information()
+    assert indexes["changed_at_ttl"]["expireAfterSeconds"] == DELETIONS_RETENTION_SECONDS
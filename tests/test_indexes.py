@@ -0,0 +1,72 @@
+"""
+The activity and announcement filters must be answered from an index
+
+The app modules are imported inside the tests, after the app fixture has
+pointed them at the test database.
+"""
+
+from datetime import date
+from typing import Any, Iterator, List
+
+import pytest
+
+
+def plan_stages(explain: Any) -> Iterator[str]:
+    """Every stage name in an explain document, however deeply nested"""
+    if isinstance(explain, dict):
+        for key, value in explain.items():
+            if key == "stage" and isinstance(value, str):
+                yield value
+            else:
+                yield from plan_stages(value)
+    elif isinstance(explain, list):
+        for item in explain:
+            yield from plan_stages(item)
+
+
+def winning_stages(sync_db, collection: str, pipeline: List[dict]) -> List[str]:
+    explain = sync_db.command("aggregate", collection, pipeline=pipeline, explain=True)
+    # Only the winning plan counts; rejected plans may scan the collection
+    for plans in find_key(explain, "rejectedPlans"):
+        plans.clear()
+    return list(plan_stages(explain))
+
+
+def find_key(document: Any, key: str) -> Iterator[Any]:
+    if isinstance(document, dict):
+        for name, value in document.items():
+            if name == key:
+                yield value
+            else:
+                yield from find_key(value, key)
+    elif isinstance(document, list):
+        for item in document:
+            yield from find_key(item, key)
+
+
+@pytest.mark.parametrize("filters", [
+    {"day": "Monday"},
+    {"day": "Tuesday", "start_time": "15:00"},
+    {"start_time": "15:00", "end_time": "17:00"},
+    {"end_time": "08:00"},
+    {"category": "sports"}
+], ids=["day", "day-start", "time-window", "end", "category"])
+def test_activity_filters_use_an_index(sync_db, filters):
+    from src.backend.enrollments import activity_view_stages
+    from src.backend.routers.activities import build_activity_query
+
+    pipeline = [{"$match": build_activity_query(**filters)}, *activity_view_stages()]
+    stages = winning_stages(sync_db, "activities", pipeline)
+
+    assert "IXSCAN" in stages
+    assert "COLLSCAN" not in stages
+
+
+def test_active_announcements_use_an_index(sync_db):
+    from src.backend.announcement_snapshot import unexpired_query
+
+    pipeline = [{"$match": unexpired_query(date.today().isoformat())}]
+    stages = winning_stages(sync_db, "announcements", pipeline)
+
+    assert "IXSCAN" in stages
+    assert "COLLSCAN" not in stages
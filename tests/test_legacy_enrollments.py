@@ -0,0 +1,41 @@
+"""
+Activities that still embed a participants array are migrated at startup
+"""
+
+import pytest
+
+NAME = "Legacy Roster Club"
+PARTICIPANTS = ["old1@mergington.edu", "old2@mergington.edu"]
+
+
+@pytest.fixture
+def legacy_activity(app, run, sync_db):
+    """An activity stored the way versions before the enrollments collection did"""
+    from src.backend.migrate_enrollments import migrate_all
+
+    sync_db.activities.insert_one({
+        "_id": NAME,
+        "description": "Activity written before enrollments had their own collection",
+        "schedule": "Saturdays, 7:00 AM - 8:00 AM",
+        "schedule_details": {"days": ["Saturday"], "start_time": "07:00", "end_time": "08:00"},
+        "max_participants": 5,
+        "participants": PARTICIPANTS
+    })
+    # What the lifespan runs when the app starts
+    run(migrate_all())
+    yield NAME
+    sync_db.activities.delete_one({"_id": NAME})
+    sync_db.enrollments.delete_many({"activity": NAME})
+
+
+def test_migrated_participants_behave_like_any_other(run, sync_db, legacy_activity):
+    from src.backend.enrollments import enroll, unenroll
+
+    activity = sync_db.activities.find_one({"_id": legacy_activity})
+    assert "participants" not in activity
+    assert activity["participant_count"] == len(PARTICIPANTS)
+
+    assert run(enroll(legacy_activity, PARTICIPANTS[0]))["status"] == "duplicate"
+    result = run(unenroll(legacy_activity, PARTICIPANTS[1]))
+    assert result["status"] == "removed"
+    assert result["participant_count"] == len(PARTICIPANTS) - 1
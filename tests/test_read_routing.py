@@ -0,0 +1,66 @@
+"""
+GET endpoints read from a secondary where they can and writes use the
+configured write concern, on a real (single-node) replica set
+"""
+
+ACTIVITY = "Chess Club"
+
+def sent(commands, name, collection):
+    return [command for command_name, command in commands
+            if command_name == name and command.get(name) == collection]
+
+
+def read_mode(command):
+    return command.get("$readPreference", {}).get("mode", "primary")
+
+
+def test_clients_are_configured_from_the_environment(app):
+    from src.backend import database
+
+    assert database.read_db.read_preference.mongos_mode == "secondaryPreferred"
+    assert database.db.write_concern.document == {"w": "majority"}
+
+
+def test_get_endpoints_read_secondary_preferred(client, run, teacher_headers, mongo_commands):
+    response = run(client.get("/activities", params={"stream": "true"}))
+    assert response.status_code == 200
+    response = run(client.get(f"/activities/{ACTIVITY}/participants"))
+    assert response.status_code == 200
+    response = run(client.get("/activities/conflicts", params={
+        "email": "michael@mergington.edu"}, headers=teacher_headers))
+    assert response.status_code == 200
+
+    reads = (sent(mongo_commands, "aggregate", "activities")
+             + sent(mongo_commands, "find", "enrollments"))
+    assert reads
+    assert {read_mode(command) for command in reads} == {"secondaryPreferred"}
+
+
+def test_cache_fills_read_the_primary(client, run, mongo_commands):
+    from src.backend.cache import bump_version
+
+    bump_version()
+    response = run(client.get("/activities", params={"category": "sports"}))
+    assert response.status_code == 200
+
+    fills = sent(mongo_commands, "aggregate", "activities")
+    assert fills
+    assert {read_mode(command) for command in fills} == {"primary"}
+
+
+def test_writes_use_the_configured_write_concern(client, run, teacher_headers, mongo_commands):
+    email = "routing-test@mergington.edu"
+    response = run(client.post(f"/activities/{ACTIVITY}/signup", params={"email": email},
+                               headers=teacher_headers))
+    assert response.status_code == 200
+    response = run(client.post(f"/activities/{ACTIVITY}/unregister", params={"email": email},
+                               headers=teacher_headers))
+    assert response.status_code == 200
+
+    writes = (sent(mongo_commands, "insert", "enrollments")
+              + sent(mongo_commands, "delete", "enrollments")
+              + sent(mongo_commands, "findAndModify", "activities"))
+    assert len(writes) >= 3
+    for command in writes:
+        assert command["writeConcern"] == {"w": "majority"}
+        assert read_mode(command) == "primary"
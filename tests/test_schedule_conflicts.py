@@ -0,0 +1,76 @@
+"""
+Concurrent signups must never double-book a student into overlapping activities
+"""
+
+import asyncio
+from collections import Counter
+
+import pytest
+
+ROUNDS = 20
+SLOT = {"days": ["Sunday"], "start_time": "11:00", "end_time": "12:00"}
+
+
+@pytest.fixture
+def overlapping(app, run, sync_db, request):
+    """Two activities on the same Sunday slot, with plenty of seats"""
+    from src.backend.database import activity_document
+    from src.backend.schedule import schedule_index
+
+    names = [f"Overlap {side} {request.node.name}" for side in ("A", "B")]
+    for name in names:
+        sync_db.activities.insert_one(activity_document(name, {
+            "description": "Overlapping activity for the conflict tests",
+            "schedule": "Sundays, 11:00 AM - 12:00 PM",
+            "schedule_details": SLOT,
+            "max_participants": 2 * ROUNDS,
+            "participants": []
+        }))
+    run(schedule_index.rebuild())
+    yield names
+    sync_db.activities.delete_many({"_id": {"$in": names}})
+    sync_db.enrollments.delete_many({"activity": {"$in": names}})
+    run(schedule_index.rebuild())
+
+
+def assert_never_double_booked(sync_db, names, results):
+    statuses = Counter(result["status"] for result in results)
+    assert set(statuses) <= {"enrolled", "conflict"}
+    for student in range(ROUNDS):
+        email = f"racer{student}@mergington.edu"
+        assert sync_db.enrollments.count_documents(
+            {"email": email, "activity": {"$in": names}}) <= 1
+    for name in names:
+        enrolled = sync_db.enrollments.count_documents({"activity": name})
+        assert sync_db.activities.find_one({"_id": name})["participant_count"] == enrolled
+
+
+def test_racing_signups_into_overlapping_activities(run, sync_db, overlapping):
+    from src.backend.enrollments import enroll
+
+    first, second = overlapping
+
+    async def race():
+        return await asyncio.gather(*[
+            enroll(name, f"racer{student}@mergington.edu")
+            for student in range(ROUNDS) for name in (first, second)])
+
+    assert_never_double_booked(sync_db, overlapping, run(race()))
+
+
+def test_racing_rush_mode_and_direct_signups(run, sync_db, overlapping):
+    from src.backend.enrollments import enroll
+    from src.backend.rush import SignupBatcher
+
+    first, second = overlapping
+    batcher = SignupBatcher(flush_seconds=0.001, max_batch=5)
+
+    async def race():
+        results = await asyncio.gather(*[
+            call for student in range(ROUNDS) for call in (
+                enroll(first, f"racer{student}@mergington.edu"),
+                batcher.submit(second, f"racer{student}@mergington.edu"))])
+        await batcher.drain()
+        return results
+
+    assert_never_double_booked(sync_db, overlapping, run(race()))
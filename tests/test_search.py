@@ -0,0 +1,18 @@
+"""
+Activity search matches whole words, and short terms as the start of a name word
+"""
+
+import pytest
+
+
+@pytest.mark.parametrize("q", ["prog", "Prog", "programming", "program"])
+def test_search_finds_the_programming_class(client, run, q):
+    response = run(client.get("/activities", params={"q": q}))
+    assert response.status_code == 200
+    assert "Programming Class" in response.json()
+
+
+def test_short_terms_only_match_the_start_of_name_words(client, run):
+    response = run(client.get("/activities", params={"q": "ramm"}))
+    assert response.status_code == 200
+    assert "Programming Class" not in response.json()
@@ -0,0 +1,79 @@
+"""
+Parallel signups must never overbook an activity
+"""
+
+import asyncio
+from collections import Counter
+
+import pytest
+
+SEATS = 10
+TAKEN = 7
+SIGNUPS = 300
+
+
+@pytest.fixture
+def nearly_full(app, sync_db, request):
+    """An activity with SEATS seats of which TAKEN are taken"""
+    from src.backend.database import activity_document, enrollment_documents
+
+    name = f"Capacity Test {request.node.name}"
+    details = {
+        "description": "Nearly full activity for the capacity tests",
+        "schedule": "Sundays, 9:00 AM - 10:00 AM",
+        "schedule_details": {"days": ["Sunday"], "start_time": "09:00", "end_time": "10:00"},
+        "max_participants": SEATS,
+        "participants": [f"taken{i}@mergington.edu" for i in range(TAKEN)]
+    }
+    sync_db.activities.insert_one(activity_document(name, details))
+    sync_db.enrollments.insert_many(enrollment_documents(name, details))
+    yield name
+    sync_db.activities.delete_one({"_id": name})
+    sync_db.enrollments.delete_many({"activity": name})
+
+
+def emails():
+    # Every fifth signup repeats an earlier student, and some repeat the
+    # students already enrolled
+    for i in range(SIGNUPS):
+        if i % 5 == 4:
+            yield f"student{i - 1}@mergington.edu"
+        elif i % 50 == 7:
+            yield "taken0@mergington.edu"
+        else:
+            yield f"student{i}@mergington.edu"
+
+
+def assert_not_overbooked(sync_db, name, statuses):
+    activity = sync_db.activities.find_one({"_id": name})
+    enrolled = sync_db.enrollments.count_documents({"activity": name})
+
+    assert statuses["enrolled"] == SEATS - TAKEN
+    assert set(statuses) <= {"enrolled", "duplicate", "full"}
+    assert enrolled == SEATS
+    assert activity["participant_count"] == SEATS
+
+
+def test_parallel_signups_fill_exactly_the_free_seats(run, sync_db, nearly_full):
+    from src.backend.enrollments import enroll
+
+    async def sign_up_everyone():
+        return await asyncio.gather(*[enroll(nearly_full, email) for email in emails()])
+
+    results = run(sign_up_everyone())
+    assert_not_overbooked(sync_db, nearly_full, Counter(result["status"] for result in results))
+
+
+def test_parallel_rush_mode_signups_fill_exactly_the_free_seats(run, sync_db, nearly_full):
+    from src.backend.rush import SignupBatcher
+
+    batcher = SignupBatcher(flush_seconds=0.005, max_batch=50)
+
+    async def sign_up_everyone():
+        results = await asyncio.gather(*[
+            batcher.submit(nearly_full, email) for email in emails()])
+        await batcher.drain()
+        return results
+
+    results = run(sign_up_everyone())
+    assert_not_overbooked(sync_db, nearly_full, Counter(result["status"] for result in results))